@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.settings import TOKEN_VERSION_CACHE_TIMEOUT
+from reviews.models import User
+
+TOKEN_VERSION_KEY = 'token_version:{pk}'
+ROLE_CLAIM = 'role'
+STAFF_CLAIM = 'is_staff'
+VERSION_CLAIM = 'ver'
+USER_NOT_FOUND = 'User not found'
+TOKEN_REVOKED = 'Token has been revoked'
+
+
+def token_version_key(pk):
+    return TOKEN_VERSION_KEY.format(pk=pk)
+
+
+def get_token_version(pk):
+    """
+    Return current token version of a user or None if there is no user.
+
+    Versions are cached for TOKEN_VERSION_CACHE_TIMEOUT and the cached
+    value is dropped by api.signals when the user changes, so with a
+    shared cache a revoked token is rejected by the next request. A miss
+    only adds the version it read, so it never overwrites a newer one
+    stored by a concurrent write.
+    """
+    key = token_version_key(pk)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=pk).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is not None:
+            cache.add(key, version, timeout=TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+class UserAccessToken(AccessToken):
+    """Access token carrying everything permission checks read."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[STAFF_CLAIM] = user.is_staff
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    User backed by token claims, loaded from the database on demand.
+
+    Permission checks read only pk, role and is_staff, which come from
+    the token. Any other attribute, or passing the object where a model
+    instance is expected, loads the User row once.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    MODERATOR = User.MODERATOR
+    ADMIN = User.ADMIN
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+
+    def __init__(self, token):
+        pk = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: User.objects.get(pk=pk))
+        self.__dict__['_claims'] = {
+            'pk': pk,
+            'role': token[ROLE_CLAIM],
+            'is_staff': token[STAFF_CLAIM],
+        }
+
+    @property
+    def pk(self):
+        return self._claims['pk']
+
+    id = pk
+
+    @property
+    def role(self):
+        return self._claims['role']
+
+    @property
+    def is_staff(self):
+        return self._claims['is_staff']
+
+    def __eq__(self, other):
+        if isinstance(other, TokenUser) or isinstance(other, User):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a User query per request.
+
+    Tokens issued by UserAccessToken are checked against the cached
+    token version of the user, which User.save() increments whenever a
+    field copied into the token changes. Older tokens without the claims
+    fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = TokenUser(validated_token)
+        version = get_token_version(user.pk)
+        if version is None:
+            raise AuthenticationFailed(
+                USER_NOT_FOUND, code='user_not_found'
+            )
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(TOKEN_REVOKED, code='token_revoked')
+        return user
@@ -0,0 +1,184 @@
+"""
+Bulk create and update of titles for catalogue feeds.
+
+Slugs of every item are resolved with one query per related model before
+validation. Valid items are written in one transaction: new titles with
+bulk_create, changed ones with bulk_update, and genre links with one
+bulk insert and one delete of the links that changed. Invalid items are
+reported by index and do not stop the others.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import serializers
+
+from api.cache import (
+    TITLE_COUNT,
+    bump_versions_on_commit,
+    shift_counter_on_commit,
+)
+from api.serializers import RESOLVED_SLUGS, TitleWriteSerializer
+from reviews.models import Category, Genre, GenreTitle, Title
+
+TITLE_NOT_FOUND = 'Title with id={id} does not exist.'
+TITLE_DUPLICATE = 'Title with id={id} is repeated in the batch.'
+CREATED = 'created'
+UPDATED = 'updated'
+FAILED = 'failed'
+WRITE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def collect_slugs(items):
+    """Return category and genre slugs mentioned by items."""
+    categories, genres = set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        category = item.get('category')
+        if isinstance(category, str):
+            categories.add(category)
+        genre = item.get('genre')
+        if isinstance(genre, list):
+            genres.update(slug for slug in genre if isinstance(slug, str))
+    return categories, genres
+
+
+def resolve_slugs(items):
+    categories, genres = collect_slugs(items)
+    return {
+        Category: Category.objects.in_bulk(categories, field_name='slug'),
+        Genre: Genre.objects.in_bulk(genres, field_name='slug'),
+    }
+
+
+def validate_items(items, titles, context):
+    """Yield (index, title, validated data, errors) of every item."""
+    creating = TitleWriteSerializer(context=context)
+    updating = TitleWriteSerializer(context=context, partial=True)
+    seen = set()
+    for index, item in enumerate(items):
+        title_id = item.get('id') if isinstance(item, dict) else None
+        title = None
+        if title_id is not None:
+            title = titles.get(title_id) if isinstance(title_id, int) else None
+            if title is None or title_id in seen:
+                message = TITLE_DUPLICATE if title else TITLE_NOT_FOUND
+                yield index, None, None, {
+                    'id': [message.format(id=title_id)]
+                }
+                continue
+            seen.add(title_id)
+        serializer = creating if title is None else updating
+        try:
+            yield index, title, serializer.run_validation(item), None
+        except serializers.ValidationError as error:
+            yield index, title, None, error.detail
+
+
+def bulk_create_titles(titles):
+    Title.objects.bulk_create(titles)
+    if titles and titles[0].pk is None:
+        # Without RETURNING the ids are recovered: the rows were inserted
+        # in this transaction under the write lock, one after another.
+        last = Title.objects.aggregate(last=Max('pk'))['last']
+        for pk, title in enumerate(titles, last - len(titles) + 1):
+            title.pk = pk
+
+
+def save_updated_titles(updated):
+    fields = {field for *_, changed in updated for field in changed}
+    # bulk_update skips auto_now, genre changes update the title too.
+    now = timezone.now()
+    for _, title, _, _ in updated:
+        title.updated_at = now
+    Title.objects.bulk_update(
+        [title for _, title, _, _ in updated],
+        [*(field for field in WRITE_FIELDS if field in fields), 'updated_at'],
+    )
+
+
+def diff_genres(changed_genres):
+    """
+    Return links to insert and ids of links to delete for new genres.
+
+    changed_genres maps title ids to sets of genre ids. Links are read
+    before the write transaction, as a read first in it could not be
+    upgraded to a write on SQLite under concurrent writers.
+    """
+    links = {}
+    for link in GenreTitle.objects.filter(title__in=changed_genres):
+        links.setdefault(link.title_id, {})[link.genre_id] = link.pk
+    inserted, deleted = [], []
+    for title_id, genres in changed_genres.items():
+        current = links.get(title_id, {})
+        deleted.extend(
+            pk for genre_id, pk in current.items() if genre_id not in genres
+        )
+        inserted.extend(
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for genre_id in genres if genre_id not in current
+        )
+    return inserted, deleted
+
+
+def save_titles(items):
+    """Validate and write items, return a report of every item."""
+    ids = [
+        item['id'] for item in items
+        if isinstance(item, dict) and isinstance(item.get('id'), int)
+    ]
+    titles = Title.objects.in_bulk(ids)
+    context = {RESOLVED_SLUGS: resolve_slugs(items)}
+    results, created, updated = [], [], []
+    for index, title, data, errors in validate_items(
+        items, titles, context
+    ):
+        if errors is not None:
+            results.append(
+                {'index': index, 'status': FAILED, 'errors': errors}
+            )
+            continue
+        genres = data.pop('genre', None)
+        if title is None:
+            created.append((index, Title(**data), genres or ()))
+            continue
+        for field, value in data.items():
+            setattr(title, field, value)
+        updated.append((index, title, genres, tuple(data)))
+    inserted, deleted = diff_genres({
+        title.pk: {genre.pk for genre in genres}
+        for _, title, genres, _ in updated if genres is not None
+    })
+    with transaction.atomic():
+        bulk_create_titles([title for _, title, _ in created])
+        if updated:
+            save_updated_titles(updated)
+        if deleted:
+            GenreTitle.objects.filter(pk__in=deleted).delete()
+        GenreTitle.objects.bulk_create([
+            *(
+                GenreTitle(title=title, genre=genre)
+                for _, title, genres in created for genre in set(genres)
+            ),
+            *inserted,
+        ])
+        if created or updated:
+            bump_versions_on_commit('titles')
+        if created:
+            # bulk_create sends no post_save.
+            shift_counter_on_commit(TITLE_COUNT, len(created))
+    results.extend(
+        {'index': index, 'status': CREATED, 'id': title.pk}
+        for index, title, _ in created
+    )
+    results.extend(
+        {'index': index, 'status': UPDATED, 'id': title.pk}
+        for index, title, _, _ in updated
+    )
+    results.sort(key=lambda result: result['index'])
+    return {
+        CREATED: len(created),
+        UPDATED: len(updated),
+        FAILED: len(items) - len(created) - len(updated),
+        'results': results,
+    }
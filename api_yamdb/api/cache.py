@@ -0,0 +1,139 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+
+from api_yamdb.settings import COUNTER_TIMEOUT
+
+# Everything here can be rebuilt from the database, see CACHES.
+cache = ConnectionProxy(caches, 'responses')
+
+VERSION_KEY = 'version:{resource}'
+RESPONSE_KEY = 'response:{digest}'
+COUNT_KEY = 'count:{digest}'
+TITLE_REVIEWS = 'reviews:{title_id}'
+REVIEW_COMMENTS = 'comments:{review_id}'
+USER = 'users:{pk}'
+# Bumped by management commands that write past the model signals.
+BULK_WRITES = 'bulk'
+COUNTER_KEY = 'counter:{name}'
+TITLE_COUNT = 'titles'
+USER_COUNT = 'users'
+REVIEW_COMMENT_COUNT = 'comments:{review_id}'
+
+
+def version_key(resource):
+    return VERSION_KEY.format(resource=resource)
+
+
+def get_versions(resources):
+    """
+    Return current version counters of resources, creating missing ones.
+
+    A missing counter starts from the current time rather than zero, so
+    a counter evicted from the cache never brings back stale responses.
+    """
+    keys = [version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_version(resource):
+    key = version_key(resource)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_versions_on_commit(*resources):
+    """Bump counters once the surrounding transaction is committed."""
+    def bump():
+        for resource in resources:
+            bump_version(resource)
+    transaction.on_commit(bump)
+
+
+def bump_bulk_writes():
+    """Invalidate every cached response after a bulk write."""
+    bump_version(BULK_WRITES)
+
+
+def get_counter(name, queryset):
+    """
+    Return a row count kept up to date by api.signals.
+
+    A missing counter is taken from queryset and lives for
+    COUNTER_TIMEOUT, which bounds the drift of writes racing with it.
+    Counters belong to the current BULK_WRITES version, so management
+    commands writing past the signals reset them all.
+    """
+    key = COUNTER_KEY.format(name=name)
+    version, = get_versions((BULK_WRITES,))
+    count = cache.get(key, version=version)
+    if count is None:
+        count = queryset.count()
+        cache.add(key, count, timeout=COUNTER_TIMEOUT, version=version)
+    return count
+
+
+def shift_counter_on_commit(name, delta):
+    """Add delta to a counter once the transaction is committed."""
+    def shift():
+        version, = get_versions((BULK_WRITES,))
+        try:
+            cache.incr(COUNTER_KEY.format(name=name), delta, version=version)
+        except ValueError:
+            # Missing counters are counted again when read.
+            pass
+    transaction.on_commit(shift)
+
+
+def normalize_query(query_params, names):
+    return urlencode(sorted(
+        (name, value)
+        for name, values in query_params.lists() if name in names
+        for value in values
+    ))
+
+
+def response_digest(request, resources, query_params):
+    """
+    Identify a representation by request and resource versions.
+
+    Only query_params take part, the host does not: absolute links of
+    cached data are stored relative to it.
+    """
+    resources = (*resources, BULK_WRITES)
+    return hashlib.md5('|'.join((
+        request.path,
+        normalize_query(request.query_params, query_params),
+        request.accepted_renderer.format,
+        *(
+            f'{resource}={version}'
+            for resource, version in zip(resources, get_versions(resources))
+        ),
+    )).encode()).hexdigest()
+
+
+def response_etag(request, digest):
+    """Tag a representation, its absolute links depend on the host."""
+    return hashlib.md5(f'{digest}|{request.get_host()}'.encode()).hexdigest()
+
+
+def response_key(digest):
+    return RESPONSE_KEY.format(digest=digest)
+
+
+def count_key(queryset):
+    """Identify a count by the SQL of the queryset it is taken from."""
+    return COUNT_KEY.format(digest=hashlib.md5(
+        repr(queryset.order_by().query.sql_with_params()).encode()
+    ).hexdigest())
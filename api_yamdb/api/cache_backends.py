@@ -0,0 +1,60 @@
+"""
+Cache backend shared by the worker processes of one host.
+
+Confirmation codes, rate limit counters and the version counters of
+cached responses have to be seen by every worker, so both caches keep
+their entries in files of one directory. Several hosts need a
+memcached or redis server instead.
+"""
+import os
+import pickle
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+LOCK_FILENAME = 'counters.lock'
+
+
+class SharedFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache with add() and incr() atomic across processes.
+
+    Both run under an exclusive lock of one file of the cache directory.
+    incr() keeps the expiry of the key, as the memory backends do,
+    instead of resetting it to the default timeout.
+    """
+
+    @contextmanager
+    def counter_lock(self):
+        self._createdir()
+        with open(os.path.join(self._dir, LOCK_FILENAME), 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.counter_lock():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self.counter_lock():
+            try:
+                with open(self._key_to_file(key, version), 'rb') as file:
+                    expiry = pickle.load(file)
+                    value = pickle.loads(zlib.decompress(file.read()))
+            except (FileNotFoundError, EOFError):
+                raise ValueError("Key '%s' not found" % key)
+            now = time.time()
+            if expiry is not None and expiry < now:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            self.set(
+                key, value, None if expiry is None else expiry - now, version
+            )
+            return value
@@ -0,0 +1,213 @@
+"""
+Change feed of the catalogue for incremental client sync.
+
+Every model of SYNCED_MODELS has an indexed updated_at and leaves a
+Tombstone when deleted. The feed merges them into one stream ordered by
+(timestamp, stream, id) and a cursor is the position of the last entry
+sent, so each page reads at most CHANGES_PAGE_SIZE + 1 rows per stream
+with an index seek.
+
+Entries newer than CHANGES_DELAY seconds are held back: a timestamp is
+taken before its transaction commits, and a cursor passing it earlier
+would skip the row for good.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from operator import attrgetter, itemgetter
+
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+
+from api.mixins import fetch_relations
+from api.pagination import INVALID_CURSOR, encode_value
+from api.serializers import (
+    CategorySerializer,
+    CommentSerializer,
+    GenreSerializer,
+    ReviewSerializer,
+    TitleReadSerializer,
+)
+from api_yamdb.settings import CHANGES_DELAY, CHANGES_PAGE_SIZE
+from reviews.models import Category, Comment, Genre, Review, Title, Tombstone
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+
+class Stream:
+    """Rows of one model ordered by timestamp_field and id."""
+
+    queryset = None
+    timestamp_field = 'updated_at'
+
+    def __init__(self, index):
+        self.index = index
+
+    def after(self, position):
+        """Filter rows placed after position of the merged stream."""
+        timestamp, index, pk = position
+        field = self.timestamp_field
+        if self.index < index:
+            return Q(**{f'{field}__gt': timestamp})
+        if self.index > index:
+            return Q(**{f'{field}__gte': timestamp})
+        return Q(**{f'{field}__gt': timestamp}) | Q(
+            **{field: timestamp, 'pk__gt': pk}
+        )
+
+    def get_queryset(self):
+        return self.queryset
+
+    def get_rows(self, position, until, limit):
+        queryset = self.get_queryset().filter(**{
+            f'{self.timestamp_field}__lte': until
+        })
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        return list(queryset.order_by(self.timestamp_field, 'pk')[:limit])
+
+    def get_position(self, row):
+        return getattr(row, self.timestamp_field), self.index, row.pk
+
+    def get_entries(self, rows):
+        """Return entries of rows in the same order."""
+        raise NotImplementedError
+
+
+class ModelStream(Stream):
+    """
+    Upserts of a model rendered by its API serializer with parent ids.
+
+    Related rows are fetched as API views fetch them, with only the
+    columns the serializer renders.
+    """
+
+    serializer_class = None
+    resource = None
+    parents = {}
+
+    def get_queryset(self):
+        return fetch_relations(self.queryset, self.serializer_class)
+
+    def get_entries(self, rows):
+        data = self.serializer_class(rows, many=True).data
+        entries = []
+        for row, item in zip(rows, data):
+            for name, lookup in self.parents.items():
+                item[name] = attrgetter(lookup)(row)
+            entries.append({
+                'op': UPSERT,
+                'resource': self.resource,
+                'id': row.pk,
+                'changed_at': row.updated_at,
+                'data': item,
+            })
+        return entries
+
+
+class CategoryStream(ModelStream):
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    resource = 'categories'
+
+
+class GenreStream(ModelStream):
+    queryset = Genre.objects.all()
+    serializer_class = GenreSerializer
+    resource = 'genres'
+
+
+class TitleStream(ModelStream):
+    queryset = Title.objects.all()
+    serializer_class = TitleReadSerializer
+    resource = 'titles'
+
+
+class ReviewStream(ModelStream):
+    queryset = Review.objects.all()
+    serializer_class = ReviewSerializer
+    resource = 'reviews'
+    parents = {'title': 'title_id'}
+
+
+class CommentStream(ModelStream):
+    # Only the title column of the review is read.
+    queryset = Comment.objects.annotate(title_id=F('review__title_id'))
+    serializer_class = CommentSerializer
+    resource = 'comments'
+    parents = {'review': 'review_id', 'title': 'title_id'}
+
+
+class TombstoneStream(Stream):
+    queryset = Tombstone.objects.all()
+    timestamp_field = 'deleted_at'
+
+    def get_entries(self, rows):
+        return [
+            {
+                'op': DELETE,
+                'resource': row.resource,
+                'id': row.object_id,
+                'changed_at': row.deleted_at,
+            }
+            for row in rows
+        ]
+
+
+STREAMS = tuple(
+    stream(index) for index, stream in enumerate((
+        CategoryStream,
+        GenreStream,
+        TitleStream,
+        ReviewStream,
+        CommentStream,
+        TombstoneStream,
+    ))
+)
+
+
+def encode_position(position):
+    data = json.dumps(position, default=encode_value)
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_position(cursor):
+    try:
+        timestamp, index, pk = json.loads(base64.urlsafe_b64decode(
+            cursor.encode()
+        ))
+        position = datetime.fromisoformat(timestamp), int(index), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise NotFound(INVALID_CURSOR)
+    if position[0].tzinfo is None or not 0 <= position[1] < len(STREAMS):
+        raise NotFound(INVALID_CURSOR)
+    return position
+
+
+def get_changes(cursor=None):
+    """Return the page of changes after cursor with the cursor of its end."""
+    position = None if cursor is None else decode_position(cursor)
+    until = timezone.now() - timedelta(seconds=CHANGES_DELAY)
+    rows = sorted(
+        (
+            (stream.get_position(row), stream, row)
+            for stream in STREAMS
+            for row in stream.get_rows(position, until, CHANGES_PAGE_SIZE + 1)
+        ),
+        key=itemgetter(0),
+    )
+    page = rows[:CHANGES_PAGE_SIZE]
+    entries = {
+        stream: iter(stream.get_entries(
+            [row for _, row_stream, row in page if row_stream is stream]
+        ))
+        for stream in STREAMS
+    }
+    return {
+        'cursor': encode_position(page[-1][0]) if page else cursor,
+        'more': len(rows) > CHANGES_PAGE_SIZE,
+        'results': [next(entries[stream]) for _, stream, _ in page],
+    }
@@ -0,0 +1,51 @@
+"""
+Single-use confirmation codes kept in the cache.
+
+The default cache is shared by all worker processes and survives their
+restarts, so a code issued by one worker is accepted by any other.
+
+A code lives for CONFIRMATION_CODE_TIMEOUT seconds and is removed by
+the first attempt to use it, right or wrong, so it can't be guessed by
+repeated attempts. Issuing or checking a code never writes to the
+database.
+"""
+import random
+
+from django.core.cache import cache
+
+from api_yamdb.settings import (
+    CONFIRMATION_CODE_LENGTH,
+    CONFIRMATION_CODE_SYMBOLS,
+    CONFIRMATION_CODE_TIMEOUT,
+)
+
+CONFIRMATION_CODE_KEY = 'confirmation_code:{pk}'
+
+
+def confirmation_code_key(user):
+    return CONFIRMATION_CODE_KEY.format(pk=user.pk)
+
+
+def issue_confirmation_code(user):
+    """Replace the code of the user with a new one and return it."""
+    code = ''.join(
+        random.choices(CONFIRMATION_CODE_SYMBOLS, k=CONFIRMATION_CODE_LENGTH)
+    )
+    cache.set(
+        confirmation_code_key(user), code, timeout=CONFIRMATION_CODE_TIMEOUT
+    )
+    return code
+
+
+def consume_confirmation_code(user, code):
+    """
+    Check the code of the user and remove it.
+
+    Only the request whose delete removed the stored code succeeds, so
+    a code is accepted at most once even under concurrent attempts.
+    """
+    key = confirmation_code_key(user)
+    stored = cache.get(key)
+    if stored is None:
+        return False
+    return cache.delete(key) and stored == code
@@ -1,6 +1,9 @@
 from django_filters import CharFilter, FilterSet, NumberFilter
+from rest_framework.filters import OrderingFilter
 
+from api.pagination import KeysetPagination
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
@@ -8,7 +11,29 @@ class TitleFilter(FilterSet):
     genre = CharFilter(field_name='genre__slug')
     name = CharFilter(field_name='name', lookup_expr='icontains')
     year = NumberFilter(field_name='year')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Order titles by relevance by default when searching.
+
+    A cursor crawl is ordered by name by default: ratings change with
+    every review, and a title whose rating passes the cursor mid-crawl
+    would be skipped or served twice.
+    """
+
+    def get_default_ordering(self, view):
+        query_params = view.request.query_params
+        if query_params.get('search'):
+            return ('search_rank', 'id')
+        if KeysetPagination.cursor_query_param in query_params:
+            return ('name', 'id')
+        return super().get_default_ordering(view)
@@ -0,0 +1,244 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.http import Http404
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api.cache import cache, response_digest, response_etag, response_key
+from api_yamdb.settings import RESPONSE_CACHE_TIMEOUT
+
+
+def iter_relations(serializer, model, prefix=''):
+    """
+    Yield (lookup, many, deferred) for every model relation rendered.
+
+    Nested serializers are walked recursively, so their own relations
+    are yielded with the parent lookup as prefix. Relations rendered by
+    a SlugRelatedField need only the slug column, every other column of
+    the related model is listed in deferred.
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        lookup = prefix + field.source
+        many = model_field.many_to_many or model_field.one_to_many
+        deferred = ()
+        if isinstance(field, serializers.SlugRelatedField):
+            deferred = tuple(
+                related_field.name
+                for related_field
+                in model_field.related_model._meta.concrete_fields
+                if not related_field.primary_key
+                and related_field.name != field.slug_field
+            )
+        yield lookup, many, deferred
+        child = getattr(field, 'child', field)
+        if isinstance(child, serializers.BaseSerializer):
+            # Relations below a prefetch belong to the prefetch itself.
+            yield from (
+                (nested_lookup, many or nested_many, nested_deferred)
+                for nested_lookup, nested_many, nested_deferred
+                in iter_relations(
+                    child, model_field.related_model, lookup + '__'
+                )
+            )
+
+
+@lru_cache(maxsize=None)
+def plan_relations(serializer_class):
+    """
+    Split serializer relations into select_related and prefetch lookups.
+
+    Also return columns of joined models to defer, so a row joined only
+    to render its slug is not loaded whole.
+    """
+    select_related, prefetch_related, deferred = [], [], []
+    relations = iter_relations(
+        serializer_class(), serializer_class.Meta.model
+    )
+    for lookup, many, columns in relations:
+        if many:
+            prefetch_related.append(lookup)
+        else:
+            select_related.append(lookup)
+            deferred.extend(f'{lookup}__{column}' for column in columns)
+    return tuple(select_related), tuple(prefetch_related), tuple(deferred)
+
+
+def fetch_relations(queryset, serializer_class):
+    """Return queryset fetching every relation rendered by the serializer."""
+    select_related, prefetch_related, deferred = plan_relations(
+        serializer_class
+    )
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if deferred:
+        queryset = queryset.defer(*deferred)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class RelatedQuerysetMixin:
+    """Fetch every relation rendered by the serializer up front."""
+
+    def get_queryset(self):
+        return fetch_relations(
+            super().get_queryset(), self.get_serializer_class()
+        )
+
+
+class NestedScopeMixin:
+    """
+    Scope a nested route by parent IDs from the URL without loading parents.
+
+    scope_lookups maps lookups on the parent, which scope_field points
+    to, to URL kwargs. Objects are filtered by them directly, and the
+    parent is checked to exist once per request, only where an empty
+    scope has to answer 404: on listing and on creating.
+    """
+    scope_model = None
+    scope_field = None
+    scope_lookups = {}
+
+    def get_scope(self):
+        return {
+            lookup: self.kwargs.get(kwarg)
+            for lookup, kwarg in self.scope_lookups.items()
+        }
+
+    def get_scope_id(self):
+        """Return ID of the parent, 404 when it does not exist."""
+        if '_scope_id' not in self.__dict__:
+            scope = self.get_scope()
+            if not self.scope_model.objects.filter(**scope).exists():
+                raise Http404
+            self._scope_id = int(scope['pk'])
+        return self._scope_id
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{
+            f'{self.scope_field}__{lookup}': value
+            for lookup, value in self.get_scope().items()
+        })
+
+    def list(self, request, *args, **kwargs):
+        self.get_scope_id()
+        return super().list(request, *args, **kwargs)
+
+
+class ConditionalResponseMixin:
+    """
+    Answer safe requests with ETags built from resource version counters.
+
+    Version counters of get_cache_resources() are bumped by api.signals
+    on every write, so a matching If-None-Match gets 304 before any query
+    or serialization runs. With cache_data set, response data is also
+    cached under the same versions.
+
+    Only query parameters of get_cache_query_params() take part in the
+    cache key, requests with any other parameter bypass the cache, so
+    made-up parameters can't fill it.
+    """
+    cache_resources = ()
+    cache_data = False
+    # Keys of absolute links, cached relative to the host.
+    link_fields = ('next', 'previous')
+    paginator_query_params = (
+        'page_query_param',
+        'page_size_query_param',
+        'count_query_param',
+        'cursor_query_param',
+    )
+
+    def get_cache_resources(self):
+        return self.cache_resources
+
+    def get_cache_query_params(self):
+        """Return names of query parameters the response depends on."""
+        names = {api_settings.URL_FORMAT_OVERRIDE}
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            names.update(filterset_class.base_filters)
+        for backend in getattr(self, 'filter_backends', ()):
+            names.update(
+                getattr(backend, name, None)
+                for name in ('ordering_param', 'search_param')
+            )
+        paginator = getattr(self, 'paginator', None)
+        names.update(
+            getattr(paginator, name, None)
+            for name in self.paginator_query_params
+        )
+        names.discard(None)
+        return names
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        query_params = self.get_cache_query_params()
+        if not set(request.query_params) <= query_params:
+            return handler(request, *args, **kwargs)
+        digest = response_digest(
+            request, self.get_cache_resources(), query_params
+        )
+        etag = quote_etag(response_etag(request, digest))
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        if self.cache_data:
+            response = self.get_cached_response(
+                response_key(digest), handler, request, *args, **kwargs
+            )
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def get_cached_response(self, key, handler, request, *args, **kwargs):
+        base = request.build_absolute_uri('/')
+        data = cache.get(key)
+        if data is not None:
+            return Response(self.move_links(data, '/', base))
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key, self.move_links(response.data, base, '/'),
+                timeout=RESPONSE_CACHE_TIMEOUT,
+            )
+        return response
+
+    def move_links(self, data, old_base, new_base):
+        """Return data with link_fields moved from old_base to new_base."""
+        if not isinstance(data, dict):
+            return data
+        links = {
+            name: new_base + data[name][len(old_base):]
+            for name in self.link_fields
+            if isinstance(data.get(name), str)
+            and data[name].startswith(old_base)
+        }
+        return {**data, **links} if links else data
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
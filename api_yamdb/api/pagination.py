@@ -0,0 +1,337 @@
+import base64
+import binascii
+import json
+from datetime import date
+from functools import partial, reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import (
+    EmptyPage,
+    InvalidPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api.cache import cache, count_key
+from api_yamdb.settings import APPROXIMATE_COUNT_TIMEOUT
+
+INVALID_CURSOR = 'Invalid cursor.'
+NO_COUNT = 'false'
+APPROXIMATE_COUNT = 'approximate'
+UNKNOWN_LAST_PAGE = 'The last page is unknown without the count'
+
+
+def encode_value(value):
+    # Full precision, so the seek never skips rows with close dates.
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+def encode_cursor(ordering, position):
+    data = json.dumps(
+        {'o': ordering, 'p': position}, ensure_ascii=False,
+        default=encode_value,
+    )
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def get_ordering_field(model, name):
+    if name == 'pk':
+        return model._meta.pk
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    Return the position of a cursor made for ordering of model rows.
+
+    Position values are converted by their fields, so a forged cursor
+    gets 404 instead of failing in the query.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = data['p']
+        if data['o'] != ordering or not isinstance(position, list) or len(
+            position
+        ) != len(ordering):
+            raise NotFound(INVALID_CURSOR)
+        return [
+            value if value is None or field is None
+            else field.to_python(value)
+            for field, value in zip(
+                (
+                    get_ordering_field(model, name)
+                    for name, _ in split_ordering(ordering)
+                ),
+                position,
+            )
+        ]
+    except (
+        binascii.Error, ValueError, TypeError, KeyError, ValidationError
+    ):
+        raise NotFound(INVALID_CURSOR)
+
+
+def split_ordering(ordering):
+    return [
+        (field.lstrip('-'), field.startswith('-')) for field in ordering
+    ]
+
+
+def after(field, descending, value):
+    # NULL sorts before any value, as it does in SQLite.
+    if descending:
+        if value is None:
+            return Q(pk__in=[])
+        return Q(**{f'{field}__lt': value}) | Q(**{f'{field}__isnull': True})
+    if value is None:
+        return Q(**{f'{field}__isnull': False})
+    return Q(**{f'{field}__gt': value})
+
+
+def equal(field, value):
+    if value is None:
+        return Q(**{f'{field}__isnull': True})
+    return Q(**{field: value})
+
+
+def seek(ordering, position):
+    """Build the filter selecting rows placed after position in ordering."""
+    fields = split_ordering(ordering)
+    conditions = []
+    for index, (field, descending) in enumerate(fields):
+        conditions.append(reduce(and_, [
+            *(
+                equal(previous, value)
+                for (previous, _), value in zip(fields[:index], position)
+            ),
+            after(field, descending, position[index]),
+        ]))
+    return reduce(or_, conditions)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on every field of the queryset ordering.
+
+    The primary key is appended to the ordering as a tie-breaker, so each
+    row has a unique position and inserts never shift the pages already
+    served. Updates of an ordering field can: a row moved across the
+    cursor mid-crawl is skipped or served again, so crawls that must see
+    every row once should order by fields that do not change.
+
+    When the leading field is nullable, NULL and non-NULL rows are read
+    as separate segments to keep the seek on the leading column a plain
+    range scan of the ordering index.
+    """
+    cursor_query_param = 'cursor'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def get_ordering(self, queryset):
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            ordering.append('id')
+        return ordering
+
+    def get_segments(self, queryset, ordering, position):
+        field, descending = split_ordering(ordering)[0]
+        try:
+            nullable = queryset.model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            nullable = False
+        if not nullable:
+            if position is not None:
+                # Redundant with the seek, it lets the index start there.
+                bound = 'lte' if descending else 'gte'
+                queryset = queryset.filter(
+                    **{f'{field}__{bound}': position[0]}
+                )
+            return [(queryset, position)]
+        not_null = queryset.filter(**{f'{field}__isnull': False})
+        null = queryset.filter(**{f'{field}__isnull': True})
+        segments = [not_null, null] if descending else [null, not_null]
+        if position is None:
+            return [(segment, None) for segment in segments]
+        start = int((position[0] is None) == descending)
+        if position[0] is not None:
+            bound = 'lte' if descending else 'gte'
+            segments[start] = segments[start].filter(
+                **{f'{field}__{bound}': position[0]}
+            )
+        return [
+            (segments[start], position),
+            *((segment, None) for segment in segments[start + 1:]),
+        ]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        position = None
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position = decode_cursor(cursor, queryset.model, self.ordering)
+        queryset = queryset.order_by(*self.ordering)
+        page = []
+        limit = self.page_size + 1
+        for segment, segment_position in self.get_segments(
+            queryset, self.ordering, position
+        ):
+            if segment_position is not None:
+                segment = segment.filter(seek(self.ordering, position))
+            page.extend(segment[:limit - len(page)])
+            if len(page) == limit:
+                break
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_position(self, instance):
+        return [
+            getattr(instance, field)
+            for field, _ in split_ordering(self.ordering)
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encode_cursor(self.ordering, self.get_position(self.page[-1])),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class CountlessPage(Page):
+    def has_next(self):
+        return self.more
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CountlessPaginator(Paginator):
+    """
+    Paginator reading one row past the page instead of counting rows.
+
+    The extra row tells if there is a next page. num_pages is only known
+    up to the page after the served one.
+    """
+    # Not a counting property: PageNumberPagination passes num_pages as
+    # the number of page=last, which is rejected instead.
+    num_pages = None
+
+    def validate_number(self, number):
+        if number is None:
+            raise InvalidPage(UNKNOWN_LAST_PAGE)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        page = CountlessPage(rows[:self.per_page], number, self)
+        page.more = len(rows) > self.per_page
+        self.num_pages = number + page.more
+        return page
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator trusting a count taken elsewhere."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+def get_approximate_count(queryset, view=None):
+    """
+    Return a count maintained by the view, or a recently cached one.
+
+    Views may keep counters of their own, like stored aggregates of a
+    parent row or counters of api.cache.get_counter(), and return them
+    from get_approximate_count(). Any other
+    count is cached by its SQL for APPROXIMATE_COUNT_TIMEOUT, so writes
+    show up in it with that delay.
+    """
+    get_count = getattr(view, 'get_approximate_count', None)
+    if get_count is not None:
+        count = get_count(queryset)
+        if count is not None:
+            return count
+    key = count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """
+    Page number pagination with opt-in keyset and count modes.
+
+    Passing the ``cursor`` query parameter (empty for the first page)
+    switches the response to KeysetPagination. ``count=false`` drops the
+    COUNT query and the ``count`` key, ``count=approximate`` takes the
+    count from get_approximate_count().
+    """
+    count_query_param = 'count'
+    cursor_query_param = KeysetPagination.cursor_query_param
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.count_mode = request.query_params.get(self.count_query_param)
+        if self.count_mode == NO_COUNT:
+            self.django_paginator_class = CountlessPaginator
+        elif self.count_mode == APPROXIMATE_COUNT:
+            self.django_paginator_class = partial(
+                KnownCountPaginator,
+                count=get_approximate_count(queryset, view),
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        if self.count_mode == NO_COUNT:
+            return Response({
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            })
+        return super().get_paginated_response(data)
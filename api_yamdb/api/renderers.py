@@ -0,0 +1,115 @@
+import csv
+from datetime import datetime
+from io import StringIO
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed.
+
+    The output is the same as of JSONRenderer with the default compact
+    unicode settings: values orjson does not encode the same way, like
+    datetimes, go through the DRF encoder. Indented output, other
+    settings and data orjson rejects fall back to JSONRenderer.
+    """
+    options = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    ) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by JSONRenderer to keep JSON a subset of javascript.
+        for character, escaped in LINE_SEPARATORS:
+            if character in ret:
+                ret = ret.replace(character, escaped)
+        return ret
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Render chunks of export rows one by one for a streaming response.
+
+    stream() yields bytes of every chunk, render() renders one list of
+    rows at once.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        header = tuple(data[0]) if data else ()
+        return b''.join(self.stream(header, [data]))
+
+    def stream(self, header, chunks):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def stream(self, header, chunks):
+        render = FastJSONRenderer().render
+        for chunk in chunks:
+            yield b''.join(render(row) + b'\n' for row in chunk)
+
+
+class CSVRenderer(ExportRenderer):
+    """Render rows as CSV with a header, lists as comma separated cells."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    @staticmethod
+    def to_cell(value):
+        if isinstance(value, datetime):
+            return JSONEncoder().default(value)
+        if isinstance(value, list):
+            return ','.join(value)
+        return value
+
+    def stream(self, header, chunks):
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        yield self.flush(buffer)
+        for chunk in chunks:
+            writer.writerows(
+                [self.to_cell(row[column]) for column in header]
+                for row in chunk
+            )
+            yield self.flush(buffer)
+
+    def flush(self, buffer):
+        value = buffer.getvalue().encode(self.charset)
+        buffer.seek(0)
+        buffer.truncate()
+        return value
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+# Exact to_representation of these fields, without the method call.
+CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+}
+
+
+class NotCompilable(Exception):
+    """Field has to go through the regular Serializer.to_representation."""
+
+
+def get_converter(field):
+    """Return a function turning a non-None attribute into the value."""
+    if isinstance(field, serializers.BaseSerializer):
+        return compile_serializer(field)
+    if isinstance(field, serializers.SlugRelatedField):
+        return attrgetter(field.slug_field)
+    if isinstance(
+        field, (serializers.RelatedField, serializers.ManyRelatedField)
+    ):
+        raise NotCompilable(field.field_name)
+    return CONVERTERS.get(type(field), field.to_representation)
+
+
+def compile_field(field, model):
+    """Return a function turning an instance into the field value."""
+    if field.source == '*' or '.' in field.source:
+        raise NotCompilable(field.field_name)
+    try:
+        model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        raise NotCompilable(field.field_name)
+    get = attrgetter(field.source)
+    if isinstance(field, serializers.ListSerializer):
+        child = compile_serializer(field.child)
+
+        def represent_many(instance):
+            related = get(instance)
+            if isinstance(related, models.Manager):
+                related = related.all()
+            return [child(item) for item in related]
+
+        return represent_many
+    convert = get_converter(field)
+
+    def represent(instance):
+        value = get(instance)
+        return None if value is None else convert(value)
+
+    return represent
+
+
+def compile_serializer(serializer):
+    """
+    Compile serializer output into one function of an instance.
+
+    Every readable field is resolved once to an attribute getter and a
+    converter, so rows skip the get_attribute, SkipField and None checks
+    Serializer.to_representation runs per field. Fields sourced from
+    anything but a model field, like methods or dotted paths, raise
+    NotCompilable.
+    """
+    meta = getattr(serializer, 'Meta', None)
+    if meta is None:
+        raise NotCompilable(type(serializer).__name__)
+    fields = [
+        (field.field_name, compile_field(field, meta.model))
+        for field in serializer._readable_fields
+    ]
+
+    def represent(instance):
+        return {name: value(instance) for name, value in fields}
+
+    return represent
+
+
+@lru_cache(maxsize=None)
+def get_representation(serializer_class):
+    try:
+        return compile_serializer(serializer_class())
+    except NotCompilable:
+        return None
+
+
+class CompiledRepresentationMixin:
+    """
+    Render instances with a function compiled once per serializer class.
+
+    Output is the same as of ModelSerializer.to_representation. The
+    compiled fields are built without context, so serializers whose
+    fields depend on it, or which cannot be compiled, fall back to it.
+    """
+
+    def to_representation(self, instance):
+        represent = get_representation(type(self))
+        if represent is None:
+            return super().to_representation(instance)
+        return represent(instance)
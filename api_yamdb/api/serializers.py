@@ -1,7 +1,10 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, transaction
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 
+from api.representation import CompiledRepresentationMixin
 from api_yamdb.settings import (
     CONFIRMATION_CODE_LENGTH,
     EMAIL_MAX_LENGTH,
@@ -11,6 +14,7 @@ from reviews.models import (
     Category,
     Comment,
     Genre,
+    GenreTitle,
     Review,
     Title,
     User,
@@ -19,6 +23,7 @@ from reviews.validators import username_validator
 
 SCORE_ERROR = 'Score has to be a value from 1 to 10.'
 REVIEW_DUPLICATE_ERROR = 'You can have only one review per title.'
+RESOLVED_SLUGS = 'resolved_slugs'
 
 
 class UserNameValidatorMixin:
@@ -37,6 +42,10 @@ class SignUpSerializer(serializers.Serializer, UserNameValidatorMixin):
     )
 
 
+class ExportQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+
+
 class UserSerializer(serializers.ModelSerializer, UserNameValidatorMixin):
 
     class Meta:
@@ -68,21 +77,27 @@ class TokenSerializer(serializers.Serializer, UserNameValidatorMixin):
     )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(
+    CompiledRepresentationMixin, serializers.ModelSerializer
+):
 
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(
+    CompiledRepresentationMixin, serializers.ModelSerializer
+):
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(
+    CompiledRepresentationMixin, serializers.ModelSerializer
+):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
     rating = serializers.IntegerField(default=0)
@@ -95,23 +110,116 @@ class TitleReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField taking instances resolved ahead when there are any.
+
+    Serializers validating many items at once pass {model: {slug:
+    instance}} as RESOLVED_SLUGS of the context, so no item queries.
+    """
+
+    def get_preloaded(self):
+        return self.context.get(RESOLVED_SLUGS, {}).get(self.queryset.model)
+
+    def to_internal_value(self, data):
+        preloaded = self.get_preloaded()
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        instance = preloaded.get(str(data))
+        if instance is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+        return instance
+
+
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    """Resolve all slugs of a SlugRelatedField in one IN query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        if child.get_preloaded() is not None:
+            return [child.to_internal_value(value) for value in data]
+        slug_field = child.slug_field
+        try:
+            found = {
+                str(getattr(instance, slug_field)): instance
+                for instance in child.get_queryset().filter(
+                    **{f'{slug_field}__in': set(data)}
+                )
+            }
+        except (TypeError, ValueError):
+            child.fail('invalid')
+        instances = []
+        for value in data:
+            instance = found.get(str(value))
+            if instance is None:
+                child.fail(
+                    'does_not_exist', slug_name=slug_field,
+                    value=smart_str(value),
+                )
+            instances.append(instance)
+        return instances
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
     )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-        many=True,
+    genre = SlugManyRelatedField(
+        child_relation=PreloadedSlugRelatedField(
+            queryset=Genre.objects.all(),
+            slug_field='slug',
+        ),
     )
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre', ())
+        with transaction.atomic():
+            title = super().create(validated_data)
+            self.set_genres(title, genres, current=())
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genres is not None:
+                self.set_genres(instance, genres)
+        return instance
+
+    def set_genres(self, title, genres, current=None):
+        """Insert and delete only GenreTitle rows that changed."""
+        if current is None:
+            # Prefetched by RelatedQuerysetMixin on PATCH.
+            current = {genre.pk for genre in title.genre.all()}
+        new = {genre.pk for genre in genres}
+        removed = set(current) - new
+        if removed:
+            GenreTitle.objects.filter(
+                title=title, genre_id__in=removed
+            ).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre_id=genre_id)
+            for genre_id in new - set(current)
+        )
+
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    CompiledRepresentationMixin, serializers.ModelSerializer
+):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -125,19 +233,20 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
-    def validate(self, attrs):
-        request = self.context.get('request')
-        if (
-            request.method != 'POST'
-            or not get_object_or_404(
-                Title, pk=self.context.get('view').kwargs.get('title_id')
-            ).reviews.filter(author=request.user).exists()
-        ):
-            return attrs
-        raise serializers.ValidationError(REVIEW_DUPLICATE_ERROR)
+    def create(self, validated_data):
+        # The unique_review constraint rejects duplicates, no query ahead.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_DUPLICATE_ERROR]}
+            )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    CompiledRepresentationMixin, serializers.ModelSerializer
+):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
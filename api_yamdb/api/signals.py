@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from api.authentication import token_version_key
+from api.cache import (
+    REVIEW_COMMENT_COUNT,
+    REVIEW_COMMENTS,
+    TITLE_COUNT,
+    TITLE_REVIEWS,
+    USER,
+    USER_COUNT,
+    bump_versions_on_commit,
+    shift_counter_on_commit,
+)
+from api_yamdb.settings import TOKEN_VERSION_CACHE_TIMEOUT
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
+
+MODEL_RESOURCES = {
+    Category: lambda instance: ('categories',),
+    Genre: lambda instance: ('genres',),
+    Title: lambda instance: ('titles',),
+    GenreTitle: lambda instance: ('titles',),
+    Review: lambda instance: (
+        'titles', TITLE_REVIEWS.format(title_id=instance.title_id)
+    ),
+    Comment: lambda instance: (
+        REVIEW_COMMENTS.format(review_id=instance.review_id),
+    ),
+    # Reviews and comments render author usernames.
+    User: lambda instance: (
+        *(('users',) if instance.renamed else ()),
+        USER.format(pk=instance.pk),
+    ),
+}
+
+
+def bump_model_resources(sender, instance, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_versions_on_commit(*MODEL_RESOURCES[sender](instance))
+
+
+for model in MODEL_RESOURCES:
+    post_save.connect(bump_model_resources, sender=model)
+    post_delete.connect(bump_model_resources, sender=model)
+m2m_changed.connect(bump_model_resources, sender=GenreTitle)
+
+
+# Counters of rows read by count=approximate pages.
+MODEL_COUNTERS = {
+    Title: lambda instance: TITLE_COUNT,
+    User: lambda instance: USER_COUNT,
+    Comment: lambda instance: REVIEW_COMMENT_COUNT.format(
+        review_id=instance.review_id
+    ),
+}
+
+
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter_on_commit(MODEL_COUNTERS[sender](instance), 1)
+
+
+def count_deleted(sender, instance, **kwargs):
+    shift_counter_on_commit(MODEL_COUNTERS[sender](instance), -1)
+
+
+for model in MODEL_COUNTERS:
+    post_save.connect(count_created, sender=model)
+    post_delete.connect(count_deleted, sender=model)
+
+
+def cache_token_version(sender, instance, **kwargs):
+    key, version = token_version_key(instance.pk), instance.token_version
+    transaction.on_commit(
+        lambda: cache.set(key, version, timeout=TOKEN_VERSION_CACHE_TIMEOUT)
+    )
+
+
+def drop_token_version(sender, instance, **kwargs):
+    key = token_version_key(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+post_save.connect(cache_token_version, sender=User)
+post_delete.connect(drop_token_version, sender=User)
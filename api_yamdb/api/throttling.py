@@ -0,0 +1,81 @@
+import hashlib
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+THROTTLE_KEY = 'throttle:{scope}:{ident}:{window}'
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding window rate limit on counters shared through the cache.
+
+    Requests are counted in fixed windows with cache.add and cache.incr,
+    and the count of the previous window is weighted by the part of it
+    still inside the sliding window. Both calls have to be atomic across
+    processes, as they are in the default shared cache backend and in
+    memcached or redis, so unlike the timestamp list of
+    SimpleRateThrottle concurrent workers never overwrite each other's
+    counts. Rejected requests are counted too, so a client has to stop
+    to get unblocked.
+
+    The rate is looked up as "<view.throttle_scope>_<scope_suffix>" in
+    DEFAULT_THROTTLE_RATES, a None rate disables the throttle.
+    """
+    scope_suffix = None
+
+    def __init__(self):
+        # The rate depends on the view, it is set in allow_request.
+        pass
+
+    def get_ident_key(self, request):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if getattr(view, 'throttle_scope', None) is None:
+            return True
+        self.scope = f'{view.throttle_scope}_{self.scope_suffix}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        ident = self.get_ident_key(request)
+        if self.rate is None or ident is None:
+            return True
+        window, offset = divmod(self.timer(), self.duration)
+        current_key, previous_key = (
+            THROTTLE_KEY.format(scope=self.scope, ident=ident, window=number)
+            for number in (int(window), int(window) - 1)
+        )
+        # Counters outlive their window to weigh the next one.
+        if self.cache.add(current_key, 1, timeout=2 * self.duration):
+            count = 1
+        else:
+            count = self.cache.incr(current_key)
+        previous = self.cache.get(previous_key, 0)
+        self.offset = offset
+        return previous * (1 - offset / self.duration) + count <= (
+            self.num_requests
+        )
+
+    def wait(self):
+        return self.duration - self.offset
+
+
+class IPThrottle(SlidingWindowThrottle):
+    scope_suffix = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(SlidingWindowThrottle):
+    """Limit attempts per username sent in the request body."""
+    scope_suffix = 'username'
+
+    def get_ident_key(self, request):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        # Hashed to keep any user input a valid cache key.
+        return hashlib.md5(username.encode()).hexdigest()
@@ -1,7 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import GetTokenView, SignUp, UserViewSet
+from api.views import (
+    ChangesView,
+    ExportView,
+    GetTokenView,
+    SignUp,
+    UserViewSet,
+)
 from .views import (
     CategoryViewSet,
     CommentViewSet,
@@ -36,4 +42,8 @@ auth_urls = [
 urlpatterns = [
     path('v1/', include(auth_urls)),
     path('v1/', include(router_v1.urls)),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path(
+        'v1/export/<slug:resource>/', ExportView.as_view(), name='export'
+    ),
 ]
@@ -1,14 +1,11 @@
-import random
-
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, response, status, views, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
@@ -17,20 +14,43 @@ from rest_framework.permissions import (
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
 
-from api.filters import TitleFilter
-from api.permissions import IsAdmin, IsAuthorOrStuffOrReadOnly, ReadOnly
-from api_yamdb.settings import (
-    DEFAULT_CONFIRMATION_CODE,
-    CONFIRMATION_CODE_LENGTH,
-    CONFIRMATION_CODE_SYMBOLS,
-    DEFAULT_FROM_EMAIL,
+from api.authentication import UserAccessToken
+from api.bulk import save_titles
+from api.changes import get_changes
+from api.filters import TitleFilter, TitleOrderingFilter
+from api.cache import (
+    REVIEW_COMMENT_COUNT,
+    REVIEW_COMMENTS,
+    TITLE_COUNT,
+    TITLE_REVIEWS,
+    USER,
+    USER_COUNT,
+    get_counter,
+)
+from api.confirmation import (
+    consume_confirmation_code,
+    issue_confirmation_code,
 )
-from reviews.models import Category, Genre, Review, Title, User
+from api.export import EXPORTS
+from api.mixins import (
+    ConditionalListMixin,
+    ConditionalResponseMixin,
+    ConditionalRetrieveMixin,
+    NestedScopeMixin,
+    RelatedQuerysetMixin,
+)
+from api.parsers import FastJSONParser, NDJSONParser
+from api.permissions import IsAdmin, IsAuthorOrStuffOrReadOnly, ReadOnly
+from api.renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from api.throttling import IPThrottle, UsernameThrottle
+from api_yamdb.settings import DEFAULT_FROM_EMAIL, TITLE_BULK_MAX_ITEMS
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import queue_email
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
+    ExportQuerySerializer,
     GenreSerializer,
     ReviewSerializer,
     SignUpSerializer,
@@ -48,10 +68,15 @@ WRONG_CODE_MESSAGE = (
 SIGNUP_ERROR = 'Username or email is already registered.'
 TOKEN_SUBJECT = 'YamDB Confirmation Code'
 TOKEN_MESSAGE = 'Confirmation code for user "{username}": {token}'
+BULK_NOT_A_LIST = 'Expected a list of titles.'
+BULK_TOO_LONG = 'Send at most {limit} titles at once.'
+EXPORT_SINCE_ERROR = 'Export of {resource} can not be filtered by date.'
 
 
 class SignUp(views.APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
@@ -63,50 +88,87 @@ class SignUp(views.APIView):
             )
         except IntegrityError:
             raise ValidationError(SIGNUP_ERROR)
-        confirmation_code = ''.join(
-            random.choices(
-                CONFIRMATION_CODE_SYMBOLS,
-                k=CONFIRMATION_CODE_LENGTH,
-            )
-        )
-        user.confirmation_code = confirmation_code
-        send_mail(
+        confirmation_code = issue_confirmation_code(user)
+        # Sent by the sendoutbox worker, not inside the request. No
+        # surrounding transaction: on SQLite a read followed by a write
+        # in one transaction fails with "database is locked" under load.
+        queue_email(
             subject=TOKEN_SUBJECT,
             message=TOKEN_MESSAGE.format(
                 username=user.username,
                 token=confirmation_code,
             ),
             from_email=DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
+            recipient=user.email,
         )
-        user.save()
         return response.Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class GetTokenView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         user = get_object_or_404(User, username=data['username'])
-        if (
-            user.confirmation_code == DEFAULT_CONFIRMATION_CODE
-            or user.confirmation_code != data['confirmation_code']
-        ):
-            user.confirmation_code = DEFAULT_CONFIRMATION_CODE
-            user.save()
+        if not consume_confirmation_code(user, data['confirmation_code']):
             return Response(
                 {'confirmation_code': [WRONG_CODE_MESSAGE]},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        user.confirmation_code = DEFAULT_CONFIRMATION_CODE
-        user.save()
-        return Response({'token': str(AccessToken.for_user(user))})
+        return Response({'token': str(UserAccessToken.for_user(user))})
+
+
+class ExportView(APIView):
+    """Stream a whole table as NDJSON or, with ?format=csv, as CSV."""
+
+    permission_classes = (IsAdmin,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, resource):
+        export = EXPORTS.get(resource)
+        if export is None:
+            raise NotFound
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get('since')
+        if since is not None and export.since_field is None:
+            raise ValidationError(
+                {'since': [EXPORT_SINCE_ERROR.format(resource=resource)]}
+            )
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(export.header, export.iter_chunks(since)),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{renderer.format}"'
+        )
+        return response
+
+    def handle_exception(self, exc):
+        # Errors are JSON whatever export format was asked for.
+        self.request.accepted_renderer = FastJSONRenderer()
+        self.request.accepted_media_type = FastJSONRenderer.media_type
+        return super().handle_exception(exc)
+
+
+class ChangesView(APIView):
+    """Upserts and deletes of the catalogue after ?since=<cursor>."""
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        return Response(get_changes(request.query_params.get('since')))
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(ConditionalResponseMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
@@ -115,6 +177,15 @@ class UserViewSet(ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def get_cache_resources(self):
+        return (USER.format(pk=self.request.user.pk),)
+
+    def get_approximate_count(self, queryset):
+        # Maintained by api.signals for the list without a search.
+        if not queryset.query.where:
+            return get_counter(USER_COUNT, queryset)
+        return None
+
     @action(
         detail=False,
         methods=('get', 'patch'),
@@ -122,10 +193,7 @@ class UserViewSet(ModelViewSet):
     )
     def me(self, request):
         if request.method == 'GET':
-            return Response(
-                UserMeSerializer(request.user, many=False).data,
-                status=status.HTTP_200_OK,
-            )
+            return self.get_conditional_response(self.retrieve_me, request)
         serializer = UserMeSerializer(
             request.user,
             partial=True,
@@ -135,8 +203,15 @@ class UserViewSet(ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def retrieve_me(self, request):
+        return Response(
+            UserMeSerializer(request.user, many=False).data,
+            status=status.HTTP_200_OK,
+        )
+
 
 class CategoryGenreViewSet(
+    ConditionalListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -146,60 +221,123 @@ class CategoryGenreViewSet(
     search_fields = ('name',)
     permission_classes = (ReadOnly | IsAdmin,)
     lookup_field = 'slug'
+    cache_data = True
 
 
 class CategoryViewSet(CategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_resources = ('categories',)
 
 
 class GenreViewSet(CategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_resources = ('genres',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    RelatedQuerysetMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Title.objects.all()
     permission_classes = (ReadOnly | IsAdmin,)
     http_method_names = ('get', 'post', 'delete', 'patch')
-    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
     ordering_fields = ('rating', 'name')
     ordering = ('-rating', 'name')
+    cache_resources = ('titles', 'categories', 'genres')
+    cache_data = True
 
     def get_serializer_class(self):
         if self.action in ('create', 'partial_update'):
             return TitleWriteSerializer
         return TitleReadSerializer
 
+    def get_approximate_count(self, queryset):
+        # Maintained by api.signals for the list without filters.
+        if not queryset.query.where:
+            return get_counter(TITLE_COUNT, queryset)
+        return None
+
+    @action(
+        detail=False,
+        methods=('post',),
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': [BULK_NOT_A_LIST]})
+        if len(request.data) > TITLE_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                BULK_TOO_LONG.format(limit=TITLE_BULK_MAX_ITEMS)
+            ]})
+        return Response(save_titles(request.data))
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    NestedScopeMixin,
+    RelatedQuerysetMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrStuffOrReadOnly)
+    scope_model = Title
+    scope_field = 'title'
+    scope_lookups = {'pk': 'title_id'}
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    def get_cache_resources(self):
+        return (
+            'users',
+            TITLE_REVIEWS.format(title_id=self.kwargs.get('title_id')),
+        )
 
-    def get_queryset(self):
-        return self.get_title().reviews.all()
+    def get_approximate_count(self, queryset):
+        # Maintained by Review.save() along with the rating.
+        return Title.objects.filter(
+            pk=self.kwargs.get('title_id')
+        ).values_list('score_count', flat=True).first()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(
+            author=self.request.user, title_id=self.get_scope_id()
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    NestedScopeMixin,
+    RelatedQuerysetMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrStuffOrReadOnly)
+    scope_model = Review
+    scope_field = 'review'
+    scope_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id'),
+    def get_cache_resources(self):
+        return (
+            'users',
+            REVIEW_COMMENTS.format(review_id=self.kwargs.get('review_id')),
         )
 
-    def get_queryset(self):
-        return self.get_review().comments.all()
+    def get_approximate_count(self, queryset):
+        # Maintained by api.signals.
+        return get_counter(
+            REVIEW_COMMENT_COUNT.format(review_id=self.get_scope_id()),
+            queryset,
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(
+            author=self.request.user, review_id=self.get_scope_id()
+        )
@@ -10,6 +10,9 @@ SECRET_KEY = 'p&l%385148kslhtyn^##a1)ilz@4zqj=rq&agdol^##zgl9(vs'
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Production serves JSON only, without the browsable API and its templates.
+JSON_ONLY = os.getenv('JSON_ONLY', str(not DEBUG)).lower() in ('1', 'true')
+
 ALLOWED_HOSTS = ['*']
 
 # Application definition
@@ -64,11 +67,31 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        *(() if JSON_ONLY else (
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        )),
     ),
-    'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CursorOptInPagination',
     'PAGE_SIZE': 6,
+    # Reverse proxies appending to X-Forwarded-For in front of the API.
+    # With 0 clients are told apart by REMOTE_ADDR, so a forged header
+    # can't get round the per-IP rate limits.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_username': '5/hour',
+        'token_ip': '60/hour',
+        'token_username': '10/hour',
+    },
 }
 
 SIMPLE_JWT = {
@@ -87,6 +110,32 @@ DATABASES = {
     }
 }
 
+# Cache
+
+# Every worker process has to see the same cache, see api.cache_backends.
+# Responses, counts and their versions, which requests can multiply, go
+# to a cache of their own: culling it never drops confirmation codes,
+# rate limit counters or token versions kept in the default one.
+
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'api.cache_backends.SharedFileBasedCache',
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'responses': {
+        'BACKEND': 'api.cache_backends.SharedFileBasedCache',
+        'LOCATION': os.path.join(CACHE_LOCATION, 'responses'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -131,9 +180,31 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'yamdb@example.com'
 CONFIRMATION_CODE_LENGTH = 6
 CONFIRMATION_CODE_SYMBOLS = '0123456789'
-DEFAULT_CONFIRMATION_CODE = 'code'
+# Seconds a confirmation code is valid, longer than email retries take.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60
 EMAIL_MAX_LENGTH = 254
 USERNAME_MAX_LENGTH = 150
 NAME_MAX_LENGTH = 256
 SLUG_MAX_LENGTH = 50
 RESERVED_USERNAMES = ['me']
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+# Seconds a count=approximate page may show a stale count.
+APPROXIMATE_COUNT_TIMEOUT = 60
+# Seconds a count maintained by signals is kept before it is recounted.
+COUNTER_TIMEOUT = 60 * 60 * 24
+TITLE_BULK_MAX_ITEMS = 1000
+# Rows read from the database and rendered at once by exports.
+EXPORT_CHUNK_SIZE = 2000
+CHANGES_PAGE_SIZE = 100
+# Seconds a change waits before the feed shows it, longer than a write
+# transaction takes to commit.
+CHANGES_DELAY = 5
+# Token versions are rewritten in the shared cache on every user change,
+# the timeout only limits how long versions of idle users are kept.
+TOKEN_VERSION_CACHE_TIMEOUT = 60 * 60
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled after every failed attempt.
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Seconds a claimed batch stays hidden from other workers.
+EMAIL_OUTBOX_LEASE = 300
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import Category, Comment, Genre, OutboxEmail, Review, Title
+from .models import User
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -43,6 +44,15 @@ class CommentAdmin(admin.ModelAdmin):
     ordering = ('-pub_date', )
 
 
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient', 'subject', 'created', 'attempts', 'sent', 'error'
+    )
+    list_filter = ('sent',)
+    search_fields = ('recipient',)
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
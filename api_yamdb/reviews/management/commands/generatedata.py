@@ -0,0 +1,439 @@
+import csv
+import os
+import random
+import time
+from datetime import date, timedelta
+from itertools import accumulate, chain, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.cache import bump_bulk_writes
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.models import User
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+GENERATE_SUCCESS = '{file}: {count} rows in {seconds:.2f}s'
+TOTAL_REPORT = 'Total generation time: {seconds:.2f}s'
+WRONG_REVIEWS = 'Number of reviews has to be positive.'
+BATCH_SIZE = 10_000
+REVIEWS = 10_000
+REVIEWS_PER_TITLE = 10
+REVIEWS_PER_USER = 5
+COMMENTS_PER_REVIEW = 0.5
+CATEGORIES = 10
+GENRES = 50
+GENRES_PER_TITLE = (1, 3)
+ZIPF_EXPONENT = 1.0
+VOCABULARY_SIZE = 5_000
+TEXTS = 10_000
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'на', 'то', 'ле', 'ва', 'до', 'сё', 'жи', 'ту', 'ма',
+    'не', 'ри', 'зо', 'бу', 'ша', 'го', 'ля', 'пе',
+)
+ROLES = (User.USER, User.MODERATOR, User.ADMIN)
+ROLE_WEIGHTS = (95, 4, 1)
+# Scores lean to the top of the scale, as on real review sites.
+SCORE_WEIGHTS = (1, 1, 2, 2, 4, 6, 9, 12, 10, 7)
+FIRST_DATE = date(2000, 1, 1)
+LAST_DATE = date(2023, 1, 1)
+SECONDS_PER_DAY = 24 * 60 * 60
+# Dates in UTC, in static/data files and as the database takes them,
+# filled with a day, a time of day and milliseconds.
+CSV_DATE_FORMAT = '%sT%s.%03dZ'
+DB_DATE_FORMAT = '%s %s.%03d'
+FIRST_YEAR = 1900
+LAST_YEAR = 2022
+
+
+def zipf_weights(size, exponent=ZIPF_EXPONENT):
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+def zipf_counts(total, size, exponent=ZIPF_EXPONENT):
+    """
+    Split total into size counts proportional to a Zipf distribution.
+
+    Counts are exact, so the sum is always total, and shuffled, so the
+    most popular objects get random IDs.
+    """
+    weights = zipf_weights(size, exponent)
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for rank in range(total - sum(counts)):
+        counts[rank] += 1
+    random.shuffle(counts)
+    return counts
+
+
+def make_vocabulary():
+    return list({
+        ''.join(random.choices(SYLLABLES, k=random.randint(2, 4)))
+        for _ in range(VOCABULARY_SIZE)
+    })
+
+
+def draw_indices(rng, size, count, batch_size=BATCH_SIZE, weights=None,
+                 cum_weights=None):
+    """Yield numpy arrays of count random indices below size."""
+    if weights is not None:
+        cum_weights = numpy.cumsum(weights)
+    if cum_weights is not None:
+        cum_weights = numpy.asarray(cum_weights, dtype=float)
+    for start in range(0, count, batch_size):
+        length = min(batch_size, count - start)
+        if cum_weights is None:
+            yield rng.integers(size, size=length)
+        else:
+            indices = cum_weights.searchsorted(
+                rng.random(length) * cum_weights[-1], side='right'
+            )
+            yield numpy.minimum(indices, size - 1, out=indices)
+
+
+def draw(population, count, batch_size=BATCH_SIZE, rng=None, weights=None,
+         cum_weights=None):
+    """
+    Return an iterator of count random.choices values.
+
+    Values are drawn batch_size at a time. With a numpy Generator as rng,
+    indices of a batch are drawn by numpy in one call instead of a Python
+    call per value.
+    """
+    if rng is None:
+        return chain.from_iterable(
+            random.choices(
+                population, weights, cum_weights=cum_weights,
+                k=min(batch_size, count - start),
+            )
+            for start in range(0, count, batch_size)
+        )
+    batches = draw_indices(
+        rng, len(population), count, batch_size, weights, cum_weights
+    )
+    if isinstance(population, range):
+        return chain.from_iterable(
+            (indices * population.step + population.start).tolist()
+            for indices in batches
+        )
+    return chain.from_iterable(
+        map(population.__getitem__, indices.tolist()) for indices in batches
+    )
+
+
+class DataGenerator:
+    """
+    Generate rows of every table in the layout of static/data CSV files.
+
+    Reviews per title and per user follow Zipf distributions. Sizes of
+    the other tables are derived from the number of reviews. Random
+    values are drawn in batches with random.choices over cumulative
+    weights instead of one call per value, or with numpy when it is
+    installed, and texts are picked from a pool generated once.
+    """
+
+    def __init__(self, reviews, exponent=ZIPF_EXPONENT,
+                 date_format=CSV_DATE_FORMAT):
+        self.reviews = reviews
+        self.date_format = date_format
+        self.titles = max(reviews // REVIEWS_PER_TITLE, 1)
+        self.review_counts = zipf_counts(reviews, self.titles, exponent)
+        # Every title needs enough distinct users for a review per user.
+        self.users = max(
+            reviews // REVIEWS_PER_USER, 2 * max(self.review_counts)
+        )
+        self.comments = int(reviews * COMMENTS_PER_REVIEW)
+        self.user_ids = list(range(1, self.users + 1))
+        random.shuffle(self.user_ids)
+        self.user_weights = list(accumulate(
+            zipf_weights(self.users, exponent)
+        ))
+        self.vocabulary = make_vocabulary()
+        self.rng = None
+        if numpy is not None:
+            # Seeded from random, so --seed repeats the numpy draws too.
+            self.rng = numpy.random.default_rng(random.getrandbits(64))
+            self.user_weights = numpy.asarray(self.user_weights)
+
+    def words(self, count):
+        return ' '.join(random.choices(self.vocabulary, k=count))
+
+    def texts(self, count, min_words, max_words):
+        pool = [
+            self.words(random.randint(min_words, max_words)).capitalize()
+            for _ in range(min(count, TEXTS))
+        ]
+        return draw(pool, count, rng=self.rng)
+
+    def dates(self, count):
+        """
+        Yield count random dates formatted with date_format.
+
+        Milliseconds since FIRST_DATE are drawn in batches and split into
+        precomputed day and time of day strings, no datetime is built per
+        date. With numpy the split is done for a whole batch at once.
+        """
+        days = [
+            (FIRST_DATE + timedelta(days=day)).isoformat()
+            for day in range((LAST_DATE - FIRST_DATE).days)
+        ]
+        times = [
+            '%02d:%02d:%02d' % (second // 3600, second // 60 % 60, second % 60)
+            for second in range(SECONDS_PER_DAY)
+        ]
+        date_format = self.date_format
+        moments = len(days) * SECONDS_PER_DAY * 1000
+        if self.rng is None:
+            for moment in draw(range(moments), count):
+                seconds, ms = divmod(moment, 1000)
+                day, second = divmod(seconds, SECONDS_PER_DAY)
+                yield date_format % (days[day], times[second], ms)
+            return
+        for batch in draw_indices(self.rng, moments, count):
+            seconds, ms = numpy.divmod(batch, 1000)
+            day, second = numpy.divmod(seconds, SECONDS_PER_DAY)
+            yield from [
+                date_format % values for values in zip(
+                    map(days.__getitem__, day.tolist()),
+                    map(times.__getitem__, second.tolist()),
+                    ms.tolist(),
+                )
+            ]
+
+    def pick_authors(self, count):
+        """Draw count distinct users, popular users more often."""
+        authors = dict.fromkeys(draw(
+            self.user_ids, count, rng=self.rng, cum_weights=self.user_weights
+        ))
+        if len(authors) < count:
+            for user_id in random.sample(self.user_ids, count):
+                authors.setdefault(user_id)
+                if len(authors) == count:
+                    break
+        return list(authors)[:count]
+
+    def generate_users(self):
+        yield ('id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name')
+        roles = draw(ROLES, self.users, rng=self.rng, weights=ROLE_WEIGHTS)
+        for user_id, role in enumerate(roles, 1):
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                role, '', '', '',
+            )
+
+    def generate_categories(self):
+        yield 'id', 'name', 'slug'
+        for category_id in range(1, CATEGORIES + 1):
+            yield (
+                category_id,
+                f'{self.words(1).capitalize()} {category_id}',
+                f'category-{category_id}',
+            )
+
+    def generate_genres(self):
+        yield 'id', 'name', 'slug'
+        for genre_id in range(1, GENRES + 1):
+            yield (
+                genre_id,
+                f'{self.words(1).capitalize()} {genre_id}',
+                f'genre-{genre_id}',
+            )
+
+    def generate_titles(self):
+        yield 'id', 'name', 'year', 'category'
+        for row in zip(
+            range(1, self.titles + 1),
+            self.texts(self.titles, 1, 4),
+            draw(range(FIRST_YEAR, LAST_YEAR + 1), self.titles, rng=self.rng),
+            draw(range(1, CATEGORIES + 1), self.titles, rng=self.rng),
+        ):
+            yield row
+
+    def generate_genre_titles(self):
+        yield 'id', 'title_id', 'genre_id'
+        link_id = 0
+        for title_id in range(1, self.titles + 1):
+            for genre_id in random.sample(
+                range(1, GENRES + 1), random.randint(*GENRES_PER_TITLE)
+            ):
+                link_id += 1
+                yield link_id, title_id, genre_id
+
+    def generate_reviews(self):
+        yield 'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        values = zip(
+            self.texts(self.reviews, 5, 30),
+            draw(
+                range(1, 11), self.reviews, rng=self.rng,
+                weights=SCORE_WEIGHTS,
+            ),
+            self.dates(self.reviews),
+        )
+        review_id = 0
+        for title_id, count in enumerate(self.review_counts, 1):
+            for author_id, (text, score, pub_date) in zip(
+                self.pick_authors(count), values
+            ):
+                review_id += 1
+                yield review_id, title_id, text, author_id, score, pub_date
+
+    def generate_comments(self):
+        yield 'id', 'review_id', 'text', 'author', 'pub_date'
+        for row in zip(
+            range(1, self.comments + 1),
+            draw(range(1, self.reviews + 1), self.comments, rng=self.rng),
+            self.texts(self.comments, 3, 15),
+            draw(
+                self.user_ids, self.comments, rng=self.rng,
+                cum_weights=self.user_weights,
+            ),
+            self.dates(self.comments),
+        ):
+            yield row
+
+    def get_tables(self):
+        return (
+            ('users.csv', User, self.generate_users),
+            ('category.csv', Category, self.generate_categories),
+            ('genre.csv', Genre, self.generate_genres),
+            ('titles.csv', Title, self.generate_titles),
+            ('genre_title.csv', GenreTitle, self.generate_genre_titles),
+            ('review.csv', Review, self.generate_reviews),
+            ('comments.csv', Comment, self.generate_comments),
+        )
+
+
+def write_csv(path, filename, rows):
+    count = -1
+    with open(os.path.join(path, filename), 'w', encoding='utf-8',
+              newline='') as file:
+        writer = csv.writer(file)
+        for count, row in enumerate(rows):
+            writer.writerow(row)
+    return count
+
+
+def get_insert_fields(model, columns):
+    """Map CSV columns to model fields, every other field gets default."""
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = fields[field.attname] = field
+    return [fields[column] for column in columns]
+
+
+def get_default_values(fields):
+    """
+    Return database values of fields missing from the rows.
+
+    Auto dates get the current time, other fields their default; both
+    are evaluated once per table.
+    """
+    now = timezone.now()
+    return tuple(
+        field.get_db_prep_save(
+            now if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+            else field.get_default(),
+            connection,
+        )
+        for field in fields
+    )
+
+
+def insert_rows(model, rows, batch_size=BATCH_SIZE):
+    """
+    Insert rows with executemany.
+
+    Rows have to hold database values, as DataGenerator yields them with
+    DB_DATE_FORMAT, so each one goes to the database as a tuple without
+    a model instance. Unlike bulk_create, it keeps file values of
+    auto_now_add dates. Model.save() and signals are not called.
+    """
+    columns = next(rows)
+    fields = get_insert_fields(model, columns)
+    other_fields = [
+        field for field in model._meta.concrete_fields
+        if field not in fields
+    ]
+    defaults = get_default_values(other_fields)
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {table} ({columns}) VALUES ({values})'.format(
+        table=quote(model._meta.db_table),
+        columns=', '.join(
+            quote(field.column) for field in (*fields, *other_fields)
+        ),
+        values=', '.join(['%s'] * (len(fields) + len(other_fields))),
+    )
+    count = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = [(*row, *defaults) for row in islice(rows, batch_size)]
+            if not batch:
+                return count
+            cursor.executemany(sql, batch)
+            count += len(batch)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic dataset of a given scale as CSV files '
+        'for importcsv or straight into an empty database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=REVIEWS,
+            help='Number of reviews, sizes of other tables follow from it.',
+        )
+        parser.add_argument(
+            '--output',
+            help=(
+                'Directory to write CSV files to, '
+                'without it rows are inserted into the database.'
+            ),
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed to generate the same dataset again.',
+        )
+
+    def handle(self, *args, **options):
+        if options['reviews'] < 1:
+            raise CommandError(WRONG_REVIEWS)
+        random.seed(options['seed'])
+        start = time.perf_counter()
+        output = options['output']
+        generator = DataGenerator(
+            options['reviews'],
+            date_format=CSV_DATE_FORMAT if output else DB_DATE_FORMAT,
+        )
+        if output:
+            os.makedirs(output, exist_ok=True)
+        with transaction.atomic():
+            for filename, model, generate in generator.get_tables():
+                table_start = time.perf_counter()
+                if output:
+                    count = write_csv(output, filename, generate())
+                else:
+                    count = insert_rows(model, generate())
+                self.stdout.write(GENERATE_SUCCESS.format(
+                    file=filename,
+                    count=count,
+                    seconds=time.perf_counter() - table_start,
+                ))
+            if not output:
+                Title.objects.refresh_scores()
+        if not output:
+            bump_bulk_writes()
+        self.stdout.write(
+            TOTAL_REPORT.format(seconds=time.perf_counter() - start)
+        )
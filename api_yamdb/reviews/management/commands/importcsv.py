@@ -1,123 +1,464 @@
 import csv
+import os
+import time
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from collections import namedtuple
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, models, transaction
+from django.utils import timezone
 
+from api.cache import bump_bulk_writes
 from api_yamdb.settings import BASE_DIR, STATIC_URL
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
-from reviews.models import User
+from reviews.models import (
+    SYNCED_MODELS,
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    Tombstone,
+    User,
+)
+from reviews.signals import touch_titles
 
 PATH = str(BASE_DIR) + STATIC_URL + 'data/'
 
 IMPORT_ERROR = 'Error while import data from "{file}": {error}.'
 IMPORT_SUCCESS = 'Data imported from "{file}" successfully.'
+IMPORT_SKIPPED = 'Import of "{file}" skipped: a referenced table failed.'
+TABLE_REPORT = '{file}: {count} rows in {seconds:.2f}s ({speed:.0f} rows/s)'
+SYNC_REPORT = (
+    '{file}: {inserted} inserted, {updated} updated, '
+    '{unchanged} unchanged, {deleted} deleted'
+)
+NO_PRIMARY_KEY = 'column "{column}" with primary keys is required'
+DELETE_WITHOUT_INCREMENTAL = '--delete can only be used with --incremental.'
+TOTAL_REPORT = 'Total import time: {seconds:.2f}s'
+CHUNK_SIZE = 1000
+WORKERS = 3
+TABLES = (
+    ('users.csv', User, False),
+    ('category.csv', Category, True),
+    ('genre.csv', Genre, True),
+    ('titles.csv', Title, True),
+    ('genre_title.csv', GenreTitle, True),
+    ('review.csv', Review, True),
+    ('comments.csv', Comment, True),
+)
+
+
+def purge_rows(model, rows):
+    """
+    Delete rows without loading them, dependent rows first.
+
+    Dependent rows are purged bottom-up or unlinked according to
+    on_delete, then every level is removed with a raw DELETE: unlike
+    QuerySet.delete() nothing is collected into memory and no delete
+    signals are sent, so their work is done here in bulk instead.
+    Return the set of models rows were deleted from.
+    """
+    purged = {model}
+    for relation in model._meta.get_fields(include_hidden=True):
+        if relation.concrete or not (
+            relation.one_to_many or relation.one_to_one
+        ):
+            continue
+        dependents = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': rows}
+        )
+        if relation.on_delete is models.CASCADE:
+            purged |= purge_rows(relation.related_model, dependents)
+        elif relation.on_delete is models.SET_NULL:
+            dependents.update(**{relation.field.name: None}, **{
+                field.attname: timezone.now()
+                for field in relation.related_model._meta.concrete_fields
+                if getattr(field, 'auto_now', False)
+            })
+    if model is GenreTitle:
+        touch_titles(Title.objects.filter(pk__in=rows.values('title_id')))
+    if model in SYNCED_MODELS:
+        pks = rows.values_list('pk', flat=True).iterator(CHUNK_SIZE)
+        for chunk in iter(lambda: list(islice(pks, CHUNK_SIZE)), []):
+            Tombstone.objects.bulk_create(
+                Tombstone(resource=SYNCED_MODELS[model], object_id=pk)
+                for pk in chunk
+            )
+    rows._raw_delete(rows.db)
+    return purged
 
 
 def purge_model(model):
-    model.objects.all().delete()
-    return
+    """Delete all rows of model and rows depending on them."""
+    if Review in purge_rows(model, model._base_manager.all()):
+        # Stored ratings of titles left without their reviews.
+        Title.objects.filter(score_count__gt=0).refresh_scores()
 
 
-def simple_import_csv(file, model):
-    model.objects.bulk_create(model(**data) for data in csv.DictReader(file))
-    return
+def get_attnames(model, columns):
+    """
+    Map CSV columns to model attribute names.
+
+    A column named after a relation is loaded into its "<name>_id"
+    attribute, so foreign keys are stored by ID without fetching objects.
+    """
+    attnames = {}
+    for field in model._meta.concrete_fields:
+        attnames[field.name] = attnames[field.attname] = field.attname
+    return {column: attnames[column] for column in columns}
 
 
-def alter_fields(row, fields):
-    for field, value in fields:
-        if isinstance(value, str):
-            # alter field name
-            row[value] = row.pop(field)
-        else:
-            # build relation
-            row[field] = value.objects.get(pk=row[field])
-    return row
+def read_chunks(rows, attnames, model, chunk_size):
+    while True:
+        chunk = [
+            model(**{attnames[column]: value for column, value in row.items()})
+            for row in islice(rows, chunk_size)
+        ]
+        if not chunk:
+            return
+        yield chunk
 
 
-def import_csv(filename, model, fields=None, clear=False, encoding='utf-8'):
+def import_csv(filename, model, clear=False, encoding='utf-8',
+               chunk_size=CHUNK_SIZE, path=PATH):
     """
     Import data from CSV file to django Model.
 
-    If every column of given file matches Model fields names
-    and Model has no relations, pass only required params.
+    Every column of given file has to match a Model field name
+    or attribute name. Columns named after relations are loaded
+    as foreign key IDs, related objects are never fetched.
 
-    Specify fields param to alter column names or build relations.
-    Important note: always build relations BEFORE altering names.
+    The file is streamed in chunks of chunk_size rows saved with
+    bulk_create inside a single transaction, so memory use does not
+    depend on file size. Model.save() and signals are not called.
 
     Required arguments:
     :param filename: filename-string with extension without path
     :param model: django Model where to save imported data
 
     Optional arguments:
-    :param fields: tuple -> (field, value)
-           field: column in given file to alter name or build relation
-           value:
-               a) Model to build foreign key
-               b) string to match Model field name
-           Important note: always build relations BEFORE altering names
     :param clear: if set TRUE delete all data before import
     :param encoding: specify file encoding
+    :param chunk_size: number of rows saved with one bulk_create
+    :param path: directory with the file, ending with a separator
 
-    :return: None
+    :return: number of imported rows or None if import failed
     """
-    if clear:
-        purge_model(model)
+    count = 0
     try:
-        with open(PATH + filename, 'r', encoding=encoding) as file:
-            if not fields:
-                simple_import_csv(file, model)
-            else:
-                for row in csv.DictReader(file):
-                    row = alter_fields(row, fields)
-                    model.objects.create(**row)
+        with open(path + filename, 'r', encoding=encoding) as file, \
+                transaction.atomic():
+            if clear:
+                purge_model(model)
+            rows = csv.DictReader(file)
+            attnames = get_attnames(model, rows.fieldnames)
+            for chunk in read_chunks(rows, attnames, model, chunk_size):
+                model.objects.bulk_create(chunk)
+                count += len(chunk)
             print(IMPORT_SUCCESS.format(file=filename))
     except Exception as error:
         print(IMPORT_ERROR.format(file=filename, error=error))
         print(traceback.format_exc())
-    return
+        return None
+    return count
+
+
+class SyncCounts(
+    namedtuple('SyncCounts', ('inserted', 'updated', 'unchanged', 'deleted'))
+):
+    @property
+    def rows(self):
+        return self.inserted + self.updated + self.unchanged
+
+
+def get_sync_fields(model, columns):
+    """
+    Map CSV columns to model fields compared and updated by sync_csv.
+
+    Fields filled in by the database on creation (auto_now_add dates)
+    are skipped, bulk_create never stores their file values anyway.
+    """
+    fields = {}
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            continue
+        fields[field.name] = fields[field.attname] = field
+    return {column: fields[column] for column in columns if column in fields}
+
+
+def read_rows(rows, fields, chunk_size):
+    """Yield chunks of rows converted to {attname: python value} dicts."""
+    while True:
+        chunk = [
+            {
+                fields[column].attname: fields[column].to_python(value)
+                for column, value in row.items()
+                if column in fields
+            }
+            for row in islice(rows, chunk_size)
+        ]
+        if not chunk:
+            return
+        yield chunk
+
+
+def sync_chunk(model, chunk, attnames, pk_name):
+    """Insert new and update changed rows of chunk, return their counts."""
+    stored = {
+        values[0]: values[1:]
+        for values in model.objects.filter(
+            pk__in=[row[pk_name] for row in chunk]
+        ).values_list(pk_name, *attnames)
+    }
+    new, changed = [], []
+    for row in chunk:
+        values = tuple(row[attname] for attname in attnames)
+        if row[pk_name] not in stored:
+            new.append(model(**row))
+        elif stored[row[pk_name]] != values:
+            changed.append(model(**row))
+    model.objects.bulk_create(new)
+    if changed and attnames:
+        # bulk_update skips pre_save, stamp auto_now fields as save() does.
+        auto_now = [
+            field for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+        for instance in changed:
+            for field in auto_now:
+                field.pre_save(instance, add=False)
+        model.objects.bulk_update(
+            changed, [*attnames, *(field.attname for field in auto_now)]
+        )
+    return len(new), len(changed), len(chunk) - len(new) - len(changed)
+
+
+def delete_missing(model, pks, chunk_size):
+    """Delete stored rows with primary keys missing from pks."""
+    missing = [
+        pk for pk in model.objects.values_list('pk', flat=True).iterator()
+        if pk not in pks
+    ]
+    deleted = 0
+    for start in range(0, len(missing), chunk_size):
+        # QuerySet.delete() cascades and sends delete signals.
+        _, counts = model.objects.filter(
+            pk__in=missing[start:start + chunk_size]
+        ).delete()
+        deleted += counts.get(model._meta.label, 0)
+    return deleted
+
+
+def sync_csv(filename, model, delete=False, encoding='utf-8',
+             chunk_size=CHUNK_SIZE, path=PATH):
+    """
+    Synchronize django Model with CSV file by primary key.
+
+    Rows missing from the table are inserted with bulk_create, rows
+    whose values differ from the stored ones are saved with bulk_update
+    and equal rows are not written at all. Unlike import_csv with clear,
+    the table is never emptied, so it keeps serving reads during reload.
+    Everything runs in a single transaction.
+
+    Required arguments:
+    :param filename: filename-string with extension without path
+    :param model: django Model where to save imported data
+
+    Optional arguments:
+    :param delete: if set TRUE delete rows missing from the file
+    :param encoding: specify file encoding
+    :param chunk_size: number of rows compared and saved at once
+    :param path: directory with the file, ending with a separator
+
+    :return: SyncCounts or None if synchronization failed
+    """
+    pk_name = model._meta.pk.attname
+    inserted = updated = unchanged = deleted = 0
+    pks = set()
+    try:
+        with open(path + filename, 'r', encoding=encoding) as file, \
+                transaction.atomic():
+            rows = csv.DictReader(file)
+            fields = get_sync_fields(model, rows.fieldnames)
+            if model._meta.pk not in fields.values():
+                raise ValueError(NO_PRIMARY_KEY.format(column=pk_name))
+            attnames = [
+                field.attname for field in dict.fromkeys(fields.values())
+                if not field.primary_key
+            ]
+            for chunk in read_rows(rows, fields, chunk_size):
+                pks.update(row[pk_name] for row in chunk)
+                chunk_inserted, chunk_updated, chunk_unchanged = sync_chunk(
+                    model, chunk, attnames, pk_name
+                )
+                inserted += chunk_inserted
+                updated += chunk_updated
+                unchanged += chunk_unchanged
+            if delete:
+                deleted = delete_missing(model, pks, chunk_size)
+            print(IMPORT_SUCCESS.format(file=filename))
+    except Exception as error:
+        print(IMPORT_ERROR.format(file=filename, error=error))
+        print(traceback.format_exc())
+        return None
+    return SyncCounts(inserted, updated, unchanged, deleted)
+
+
+def get_dependencies(models):
+    """Map every model to the models it references by foreign keys."""
+    return {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+
+
+class ImportScheduler:
+    """
+    Import tables concurrently in foreign key dependency order.
+
+    A table is submitted to the worker pool as soon as every table it
+    references is committed, so independent tables load in parallel.
+    SQLite allows a single writer, which keeps its lock until the
+    transaction of the whole file commits, so imports could not overlap
+    there anyway: SQLite gets no speedup and tables are imported one at
+    a time. Parallel loading needs a backend with concurrent writers.
+
+    With incremental set tables are synchronized by sync_csv instead,
+    their clear flags are ignored.
+    """
+
+    def __init__(self, tables, workers, after_import=None,
+                 incremental=False, delete=False, path=PATH):
+        self.tables = {
+            model: (filename, clear) for filename, model, clear in tables
+        }
+        self.dependencies = get_dependencies(set(self.tables))
+        self.workers = 1 if connection.vendor == 'sqlite' else workers
+        self.after_import = after_import or {}
+        self.incremental = incremental
+        self.delete = delete
+        self.path = path
+        self.results = {}
+
+    def run_import(self, model):
+        filename, clear = self.tables[model]
+        try:
+            start = time.perf_counter()
+            if self.incremental:
+                count = sync_csv(
+                    filename, model, delete=self.delete, path=self.path
+                )
+            else:
+                count = import_csv(
+                    filename, model, clear=clear, path=self.path
+                )
+            if count is not None and model in self.after_import:
+                self.after_import[model]()
+        finally:
+            connections.close_all()
+        return count, time.perf_counter() - start
+
+    def get_ready(self):
+        """Return tables with all parents imported, skip failed branches."""
+        ready = []
+        for model in self.tables:
+            parents = self.dependencies[model]
+            if model in self.results or not parents <= set(self.results):
+                continue
+            if any(self.results[parent][0] is None for parent in parents):
+                self.results[model] = (None, 0)
+                print(IMPORT_SKIPPED.format(file=self.tables[model][0]))
+                return self.get_ready()
+            ready.append(model)
+        return ready
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            while True:
+                for model in self.get_ready():
+                    if model not in pending.values():
+                        future = executor.submit(self.run_import, model)
+                        pending[future] = model
+                if not pending:
+                    return self.results
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.results[pending.pop(future)] = future.result()
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **options):
-        import_csv('users.csv', User)
-        import_csv('category.csv', Category, clear=True)
-        import_csv('genre.csv', Genre, clear=True)
-        import_csv(
-            filename='titles.csv',
-            model=Title,
-            fields=(
-                ('category', Category),
-            ),
-            clear=True,
+    help = (
+        'Import CSV files from static/data, independent tables in parallel '
+        'on databases with concurrent writers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=PATH,
+            help='Directory with CSV files, static/data by default.',
         )
-        import_csv(
-            filename='genre_title.csv',
-            model=GenreTitle,
-            fields=(
-                ('title_id', Title),
-                ('title_id', 'title'),
-                ('genre_id', Genre),
-                ('genre_id', 'genre'),
-            ),
-            clear=True,
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WORKERS,
+            help='Number of tables imported at the same time, 1 on SQLite.',
         )
-        import_csv(
-            filename='review.csv',
-            model=Review,
-            fields=(
-                ('title_id', Title),
-                ('title_id', 'title'),
-                ('author', User),
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Insert new and update changed rows by primary key '
+                'instead of reloading tables.'
             ),
-            clear=True,
         )
-        import_csv(
-            filename='comments.csv',
-            model=Comment,
-            fields=(
-                ('review_id', Review),
-                ('review_id', 'review'),
-                ('author', User),
-            ),
-            clear=True,
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='With --incremental delete rows missing from the files.',
+        )
+
+    def handle(self, *args, **options):
+        if options['delete'] and not options['incremental']:
+            raise CommandError(DELETE_WITHOUT_INCREMENTAL)
+        start = time.perf_counter()
+        results = ImportScheduler(
+            TABLES,
+            workers=options['workers'],
+            # bulk_create skips Review.save(), recalculate stored ratings.
+            after_import={Review: Title.objects.refresh_scores},
+            incremental=options['incremental'],
+            delete=options['delete'],
+            path=os.path.join(options['path'], ''),
+        ).run()
+        # Rows are written past the signals that bump cache versions.
+        bump_bulk_writes()
+        for filename, model, _ in TABLES:
+            count, seconds = results[model]
+            if count is None:
+                continue
+            if options['incremental']:
+                self.stdout.write(
+                    SYNC_REPORT.format(file=filename, **count._asdict())
+                )
+                count = count.rows
+            self.stdout.write(TABLE_REPORT.format(
+                file=filename,
+                count=count,
+                seconds=seconds,
+                speed=count / seconds if seconds else 0,
+            ))
+        self.stdout.write(
+            TOTAL_REPORT.format(seconds=time.perf_counter() - start)
         )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from reviews.search import rebuild_index
+
+REBUILD_SUCCESS = 'Title search index rebuilt.'
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of titles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        with transaction.atomic(using=options['database']):
+            rebuild_index(connections[options['database']])
+        self.stdout.write(REBUILD_SUCCESS)
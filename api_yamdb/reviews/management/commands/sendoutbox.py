@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_yamdb.settings import EMAIL_OUTBOX_BATCH_SIZE
+from reviews.outbox import send_due
+
+SEND_REPORT = 'Emails sent: {sent}, failed: {failed}.'
+POLL_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_OUTBOX_BATCH_SIZE,
+            help='Number of emails claimed from the outbox at once.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting when empty.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=POLL_INTERVAL,
+            help='Seconds between polls with --loop.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_due(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(SEND_REPORT.format(sent=sent, failed=failed))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
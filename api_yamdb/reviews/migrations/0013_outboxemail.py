@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-16 22:23
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='получатель')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='отправитель')),
+                ('subject', models.CharField(max_length=255, verbose_name='тема')),
+                ('message', models.TextField(verbose_name='текст')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='отправить после')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попытки отправки')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='дата отправки')),
+                ('error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'исходящее письмо',
+                'verbose_name_plural': 'исходящие письма',
+                'ordering': ('send_after', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(condition=models.Q(sent__isnull=True), fields=['send_after', 'id'], name='outbox_pending_idx'),
+        ),
+    ]
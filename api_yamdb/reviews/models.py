@@ -1,19 +1,22 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import (MaxValueValidator, MinValueValidator)
-from django.db import models
-from django.db.models import CharField
+from django.db import models, transaction
+from django.db.models import CharField, Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 
 from api_yamdb.settings import (
-    DEFAULT_CONFIRMATION_CODE,
-    CONFIRMATION_CODE_LENGTH,
     EMAIL_MAX_LENGTH,
     NAME_MAX_LENGTH,
     SLUG_MAX_LENGTH,
     USERNAME_MAX_LENGTH,
 )
+from .search import FTS_TABLE, MatchField
 from .validators import username_validator, year_validator
 
 NOTE_MAX_LENGTH = 30
+SUBJECT_MAX_LENGTH = 255
+RESOURCE_MAX_LENGTH = 20
 
 
 class User(AbstractUser):
@@ -35,14 +38,6 @@ class User(AbstractUser):
         'о себе',
         blank=True,
     )
-    confirmation_code = models.CharField(
-        'код подтверждения',
-        max_length=max(
-            CONFIRMATION_CODE_LENGTH,
-            len(DEFAULT_CONFIRMATION_CODE),
-        ),
-        default=DEFAULT_CONFIRMATION_CODE,
-    )
     email = models.EmailField(
         'адрес почты',
         max_length=EMAIL_MAX_LENGTH,
@@ -64,7 +59,17 @@ class User(AbstractUser):
         max_length=max(len(role) for role, _ in ROLES),
         default=USER,
     )
+    token_version = models.PositiveIntegerField(
+        'версия токенов',
+        default=0,
+        editable=False,
+    )
     REQUIRED_FIELDS = ('email',)
+    # Fields copied into access tokens, changing them revokes the tokens.
+    TOKEN_FIELDS = ('role', 'is_staff', 'is_active')
+    # Whether the last save changed the username rendered with reviews
+    # and comments, unknown usernames count as changed.
+    renamed = True
 
     class Meta:
         verbose_name = 'пользователь'
@@ -74,6 +79,37 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.TOKEN_FIELDS):
+            instance._loaded_token_fields = instance.get_token_fields()
+        if 'username' in loaded:
+            instance._loaded_username = loaded['username']
+        return instance
+
+    def get_token_fields(self):
+        return tuple(getattr(self, field) for field in self.TOKEN_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_token_fields', None)
+        if (
+            not self._state.adding
+            and loaded is not None
+            and loaded != self.get_token_fields()
+        ):
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        self.renamed = not self._state.adding and getattr(
+            self, '_loaded_username', None
+        ) != self.username
+        super().save(*args, **kwargs)
+        self._loaded_token_fields = self.get_token_fields()
+        self._loaded_username = self.username
+
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
@@ -94,10 +130,16 @@ class NameSlugModel(models.Model):
         max_length=SLUG_MAX_LENGTH,
         unique=True,
     )
+    updated_at = models.DateTimeField('дата изменения', auto_now=True)
 
     class Meta:
         abstract = True
         ordering = ('name',)
+        indexes = [
+            models.Index(
+                fields=('updated_at', 'id'), name='%(class)s_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -115,6 +157,43 @@ class Genre(NameSlugModel):
         verbose_name_plural = 'жанры'
 
 
+class TitleQuerySet(models.QuerySet):
+    def change_scores(self, score_sum, score_count):
+        """Shift stored review aggregates by given deltas in one UPDATE."""
+        new_sum = F('score_sum') + score_sum
+        new_count = F('score_count') + score_count
+        return self.update(
+            score_sum=new_sum,
+            score_count=new_count,
+            updated_at=timezone.now(),
+            rating=(
+                Cast(new_sum, models.FloatField()) / NullIf(new_count, 0)
+            ),
+        )
+
+    def refresh_scores(self):
+        """Recalculate stored review aggregates from the reviews table."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0,
+        )
+        score_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0,
+        )
+        return self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            updated_at=timezone.now(),
+            rating=(
+                Cast(score_sum, models.FloatField()) / NullIf(score_count, 0)
+            ),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(
         'название',
@@ -141,11 +220,56 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='жанр'
     )
+    score_sum = models.PositiveIntegerField(
+        'сумма оценок',
+        default=0,
+        editable=False,
+    )
+    score_count = models.PositiveIntegerField(
+        'количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        'рейтинг',
+        null=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('дата изменения', auto_now=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('name',)
         verbose_name = 'произведение'
         verbose_name_plural = 'произведения'
+        indexes = [
+            models.Index(
+                fields=('-rating', 'name', 'id'),
+                name='title_rating_name_idx',
+            ),
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(
+                fields=('updated_at', 'id'), name='title_updated_idx'
+            ),
+        ]
+
+
+class TitleSearchIndex(models.Model):
+    """Full-text index row of a title, maintained by database triggers."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+    )
+    query = MatchField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
 
 
 class GenreTitle(models.Model):
@@ -164,6 +288,7 @@ class NoteModel(models.Model):
     )
     text = models.TextField('текст')
     pub_date = models.DateTimeField('дата создания', auto_now_add=True)
+    updated_at = models.DateTimeField('дата изменения', auto_now=True)
 
     class Meta:
         abstract = True
@@ -194,6 +319,43 @@ class Review(NoteModel):
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('updated_at', 'id'), name='review_updated_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'title_id' in loaded and 'score' in loaded:
+            instance._loaded_score = (loaded['title_id'], loaded['score'])
+        return instance
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._update_title_scores(created)
+        self._loaded_score = (self.title_id, self.score)
+
+    def _update_title_scores(self, created):
+        titles = Title.objects.all()
+        if created:
+            titles.filter(pk=self.title_id).change_scores(self.score, 1)
+            return
+        loaded = getattr(self, '_loaded_score', None)
+        if loaded is None:
+            titles.filter(pk=self.title_id).refresh_scores()
+        elif loaded != (self.title_id, self.score):
+            loaded_title_id, loaded_score = loaded
+            titles.filter(pk=loaded_title_id).change_scores(-loaded_score, -1)
+            titles.filter(pk=self.title_id).change_scores(self.score, 1)
 
 
 class Comment(NoteModel):
@@ -205,3 +367,95 @@ class Comment(NoteModel):
     class Meta(NoteModel.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=('updated_at', 'id'), name='comment_updated_idx'
+            ),
+        ]
+
+
+class OutboxEmail(models.Model):
+    """Email queued in the request transaction, sent by sendoutbox."""
+    recipient = models.EmailField(
+        'получатель',
+        max_length=EMAIL_MAX_LENGTH,
+    )
+    from_email = models.EmailField(
+        'отправитель',
+        max_length=EMAIL_MAX_LENGTH,
+    )
+    subject = models.CharField(
+        'тема',
+        max_length=SUBJECT_MAX_LENGTH,
+    )
+    message = models.TextField('текст')
+    created = models.DateTimeField('дата создания', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'отправить после',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'попытки отправки',
+        default=0,
+    )
+    sent = models.DateTimeField(
+        'дата отправки',
+        null=True,
+        blank=True,
+    )
+    error = models.TextField(
+        'последняя ошибка',
+        blank=True,
+    )
+
+    class Meta:
+        ordering = ('send_after', 'id')
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'исходящие письма'
+        indexes = [
+            models.Index(
+                fields=('send_after', 'id'),
+                name='outbox_pending_idx',
+                condition=Q(sent__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
+
+
+class Tombstone(models.Model):
+    """Deleted object of SYNCED_MODELS, kept for the change feed."""
+    resource = models.CharField(
+        'ресурс',
+        max_length=RESOURCE_MAX_LENGTH,
+    )
+    object_id = models.PositiveIntegerField('идентификатор объекта')
+    deleted_at = models.DateTimeField('дата удаления', auto_now_add=True)
+
+    class Meta:
+        ordering = ('deleted_at', 'id')
+        verbose_name = 'удалённый объект'
+        verbose_name_plural = 'удалённые объекты'
+        indexes = [
+            models.Index(
+                fields=('deleted_at', 'id'), name='tombstone_deleted_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.resource} {self.object_id}'
+
+
+# Models tracked by updated_at and tombstones, with their API resources.
+SYNCED_MODELS = {
+    Category: 'categories',
+    Genre: 'genres',
+    Title: 'titles',
+    Review: 'reviews',
+    Comment: 'comments',
+}
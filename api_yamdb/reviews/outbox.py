@@ -0,0 +1,110 @@
+"""
+Transactional email outbox.
+
+Views queue emails with queue_email() in the same transaction as the
+data they describe, so an email is sent only for committed changes and
+requests never wait for the mail server. The sendoutbox command drains
+due emails in batches over one mail connection. Failed emails are
+retried with exponential backoff until they run out of attempts.
+"""
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api_yamdb.settings import (
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_LEASE,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_RETRY_DELAY,
+)
+from .models import OutboxEmail
+
+
+def queue_email(subject, message, from_email, recipient):
+    return OutboxEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def get_due(now):
+    return OutboxEmail.objects.filter(
+        sent__isnull=True,
+        send_after__lte=now,
+        attempts__lt=EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Lease a batch of due emails to this worker.
+
+    Claimed emails are moved EMAIL_OUTBOX_LEASE seconds into the future,
+    so concurrent workers skip them, and the batch of a crashed worker
+    is sent again once the lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            get_due(now).select_for_update(skip_locked=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(send_after=now + timedelta(seconds=EMAIL_OUTBOX_LEASE))
+    return batch
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def send_batch(batch, connection):
+    """
+    Send claimed emails, return the number of sent ones.
+
+    The connection is opened once and kept open for the next emails.
+    It is closed after a failure, as the server may have dropped it.
+    """
+    now = timezone.now()
+    for email in batch:
+        email.attempts += 1
+        try:
+            connection.open()
+            EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=connection,
+            ).send()
+        except Exception as error:
+            email.error = f'{type(error).__name__}: {error}'
+            email.send_after = now + retry_delay(email.attempts)
+            connection.close()
+        else:
+            email.sent = now
+            email.error = ''
+    OutboxEmail.objects.bulk_update(
+        batch, ('attempts', 'error', 'send_after', 'sent')
+    )
+    return sum(email.sent is not None for email in batch)
+
+
+def send_due(batch_size=EMAIL_OUTBOX_BATCH_SIZE):
+    """Send every due email, return numbers of sent and failed ones."""
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        while True:
+            batch = claim_batch(batch_size)
+            if not batch:
+                return sent, failed
+            batch_sent = send_batch(batch, connection)
+            sent += batch_sent
+            failed += len(batch) - batch_sent
+    finally:
+        connection.close()
@@ -0,0 +1,139 @@
+"""
+Full-text search over Title name and description.
+
+On SQLite titles are indexed by a contentless FTS5 table kept in sync by
+triggers, so any write path (ORM, admin, bulk_create, raw SQL) updates
+the index. SQLite drops triggers when a migration remakes the title
+table, so they are recreated after every migrate. Indexed text and
+queries are normalized the same way: unicode61 folds case for any
+script and "ё" is folded to "е".
+"""
+import re
+
+from django.db import connections, models
+from django.db.models import F, FloatField, Lookup, Value
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_sql(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def indexed_values(row):
+    name = normalize_sql(f'{row}.name')
+    description = normalize_sql(f"coalesce({row}.description, '')")
+    return f'{row}.id, {name}, {description}'
+
+
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, description, content='', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert '
+    f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f"VALUES ({indexed_values('new')}); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete '
+    f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', {indexed_values('old')}); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update '
+    f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', {indexed_values('old')}); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f"VALUES ({indexed_values('new')}); END",
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+REBUILD_SQL = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f"SELECT {indexed_values(TITLE_TABLE)} FROM {TITLE_TABLE}",
+)
+
+
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class MatchField(models.TextField):
+    """FTS5 hidden column named after its table, used as MATCH target."""
+
+
+MatchField.register_lookup(Match)
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def execute(connection, statements):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    execute(schema_editor.connection, CREATE_SQL)
+    execute(schema_editor.connection, REBUILD_SQL[1:])
+
+
+def ensure_triggers(using, **kwargs):
+    connection = connections[using]
+    if TITLE_TABLE in connection.introspection.table_names():
+        execute(connection, CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    execute(schema_editor.connection, DROP_SQL)
+
+
+def rebuild_index(connection):
+    execute(connection, REBUILD_SQL)
+
+
+def normalize(text):
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def match_query(text):
+    """Turn user input into an FTS5 query matching every word prefix."""
+    return ' '.join(
+        f'"{token}"*' for token in TOKEN_PATTERN.findall(normalize(text))
+    )
+
+
+def search_titles(queryset, text):
+    """
+    Filter titles matching text and annotate them with search_rank.
+
+    Lower search_rank means better match. Backends without FTS5 fall
+    back to a case-insensitive substring match on name.
+    """
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(name__icontains=text).annotate(
+            search_rank=Value(0, output_field=FloatField())
+        )
+    query = match_query(text)
+    if not query:
+        return queryset.annotate(
+            search_rank=Value(0, output_field=FloatField())
+        ).none()
+    return queryset.filter(search_index__query__match=query).annotate(
+        search_rank=F('search_index__rank')
+    )
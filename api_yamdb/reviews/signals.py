@@ -0,0 +1,56 @@
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    SYNCED_MODELS,
+    Category,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    Tombstone,
+)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    # Fires inside the deletion transaction, cascades included.
+    Title.objects.filter(pk=instance.title_id).change_scores(
+        -instance.score, -1
+    )
+
+
+def add_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        resource=SYNCED_MODELS[sender], object_id=instance.pk
+    )
+
+
+for model in SYNCED_MODELS:
+    post_delete.connect(add_tombstone, sender=model)
+
+
+def touch_titles(titles):
+    """Mark titles changed by writes that skip Title.save()."""
+    titles.update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_related_titles(sender, instance, **kwargs):
+    # Titles lose the category or the genre without being saved.
+    touch_titles(Title.objects.filter(**{
+        'category' if sender is Category else 'genre': instance
+    }))
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def touch_genre_titles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            touch_titles(Title.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        touch_titles(Title.objects.filter(genre=instance))
+    elif action in ('post_add', 'post_remove'):
+        touch_titles(Title.objects.filter(pk__in=pk_set))
@@ -0,0 +1,293 @@
+"""
+Benchmark every API route through the WSGI application.
+
+Seeds a throwaway SQLite database with generatedata for each size and
+sends concurrent requests to every route of api/urls.py. Median and
+99th percentile latency, requests per second and queries per request
+are compared with a JSON baseline. Response data caching is turned off
+and queries are counted on a cold cache, so every route reports the work
+it does rather than a cache hit:
+
+    python benchmarks/endpoints.py --sizes 1000 100000 --save
+    python benchmarks/endpoints.py --sizes 1000 100000 --threshold 0.2
+
+The run exits with status 1 when a route is slower, serves fewer
+requests per second or runs more queries than the baseline allows.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+PREFIX = '/api/v1/'
+USERNAME = 'benchmark'
+EMAIL = 'benchmark@yamdb.fake'
+WRONG_CODE = '000000'
+
+
+def call(application, method, path, token=None, data=None):
+    """Send one request to the WSGI application and return its status."""
+    path, _, query = path.partition('?')
+    body = json.dumps(data).encode() if data is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    }
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(
+        environ, lambda status, headers, *args: statuses.append(status)
+    )
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+def get_routes():
+    """Return (name, method, path, token, data) of every API route."""
+    from django.db.models import Count
+    from api.authentication import UserAccessToken
+    from reviews.models import Review, Title, User
+
+    admin, _ = User.objects.get_or_create(
+        username=USERNAME, email=EMAIL, role=User.ADMIN
+    )
+    token = str(UserAccessToken.for_user(admin))
+    # The most reviewed title and commented review give the heaviest pages.
+    title = Title.objects.annotate(
+        total=Count('reviews')
+    ).order_by('-total').first()
+    review = Review.objects.filter(title=title).annotate(
+        total=Count('comments')
+    ).order_by('-total').first()
+    comment = review.comments.first()
+    reviews = f'{PREFIX}titles/{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    routes = [
+        ('auth/signup', 'POST', f'{PREFIX}auth/signup/', None,
+         {'username': USERNAME, 'email': EMAIL}),
+        # A wrong code does not reset the code of the other requests.
+        ('auth/token', 'POST', f'{PREFIX}auth/token/', None,
+         {'username': USERNAME, 'confirmation_code': WRONG_CODE}),
+        ('users', 'GET', f'{PREFIX}users/', token, None),
+        ('users/{username}', 'GET', f'{PREFIX}users/{USERNAME}/', token,
+         None),
+        ('users/me', 'GET', f'{PREFIX}users/me/', token, None),
+        ('categories', 'GET', f'{PREFIX}categories/', None, None),
+        ('genres', 'GET', f'{PREFIX}genres/', None, None),
+        ('titles', 'GET', f'{PREFIX}titles/', None, None),
+        ('titles?cursor', 'GET', f'{PREFIX}titles/?cursor=', None, None),
+        ('titles/{id}', 'GET', f'{PREFIX}titles/{title.pk}/', None, None),
+        ('reviews', 'GET', reviews, None, None),
+        ('reviews/{id}', 'GET', f'{reviews}{review.pk}/', None, None),
+    ]
+    if comment is not None:
+        routes += [
+            ('comments', 'GET', comments, None, None),
+            ('comments/{id}', 'GET', f'{comments}{comment.pk}/', None,
+             None),
+        ]
+    return routes
+
+
+def clear_caches():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+
+
+def disable_response_cache():
+    """Make every view build its response data on each request."""
+    from api.mixins import ConditionalResponseMixin
+    import api.views  # noqa: F401, registers the views as subclasses.
+
+    views = [ConditionalResponseMixin]
+    while views:
+        view = views.pop()
+        view.cache_data = False
+        views.extend(view.__subclasses__())
+
+
+def count_queries(application, route):
+    """Return the number of queries of the route on a cold cache."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    _, method, path, token, data = route
+    clear_caches()
+    with CaptureQueriesContext(connection) as context:
+        call(application, method, path, token, data)
+    return len(context.captured_queries)
+
+
+def measure(application, route, requests, concurrency):
+    """Send requests concurrently, return latency and throughput stats."""
+    _, method, path, token, data = route
+
+    def timed_call(_):
+        start = time.perf_counter()
+        status = call(application, method, path, token, data)
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_call, range(requests)))
+    seconds = time.perf_counter() - start
+    latencies = [latency * 1000 for latency, _ in results]
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'status': sorted({status for _, status in results}),
+        'p50_ms': round(percentiles[49], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'rps': round(requests / seconds, 1),
+        'queries': count_queries(application, route),
+    }
+
+
+def seed(size):
+    from django.core.management import call_command
+    from django.db import connection
+
+    database = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+    connection.close()
+    connection.settings_dict['NAME'] = database.name
+    call_command('migrate', verbosity=0)
+    call_command(
+        'generatedata', reviews=size, seed=size, stdout=StringIO()
+    )
+    return database.name
+
+
+def run(sizes, requests, concurrency):
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    application = get_wsgi_application()
+    disable_response_cache()
+    report = {}
+    for size in sizes:
+        database = seed(size)
+        report[str(size)] = results = {}
+        for route in get_routes():
+            clear_caches()
+            # Warm up lazily loaded code and connections of the route.
+            call(application, *route[1:])
+            results[route[0]] = measure(
+                application, route, requests, concurrency
+            )
+            print(f'{size:>9} {route[0]:<18} ' + ' '.join(
+                f'{name}={value}'
+                for name, value in results[route[0]].items()
+            ))
+        connection.close()
+        os.unlink(database)
+    return report
+
+
+def compare(report, baseline, threshold):
+    """Return descriptions of every metric regressed past threshold."""
+    regressions = []
+    for size, routes in report.items():
+        for name, result in routes.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected is None:
+                continue
+            limit = 1 + threshold
+            checks = (
+                ('p50_ms', result['p50_ms'] > expected['p50_ms'] * limit),
+                ('p99_ms', result['p99_ms'] > expected['p99_ms'] * limit),
+                ('rps', result['rps'] < expected['rps'] / limit),
+                ('queries', result['queries'] > expected['queries']),
+            )
+            regressions.extend(
+                f'{size} {name}: {metric} {expected[metric]} -> '
+                f'{result[metric]}'
+                for metric, regressed in checks if regressed
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1_000, 100_000],
+        help='Numbers of generated reviews to seed the database with.',
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Allowed relative slowdown, 0.2 means 20%%.',
+    )
+    parser.add_argument(
+        '--save', action='store_true',
+        help='Write results to the baseline instead of comparing.',
+    )
+    args = parser.parse_args()
+
+    # Like the database of seed(), the cache is a throwaway directory.
+    cache_location = tempfile.mkdtemp()
+    os.environ['CACHE_LOCATION'] = cache_location
+
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    # Every request comes from one client, auth limits would answer 429.
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = dict.fromkeys(
+        settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    )
+    django.setup()
+
+    try:
+        report = run(args.sizes, args.requests, args.concurrency)
+    finally:
+        shutil.rmtree(cache_location)
+    if args.save:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+        baseline.update(report)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f'Baseline saved to {args.baseline}')
+        return
+    if not args.baseline.exists():
+        sys.exit(f'No baseline at {args.baseline}, run with --save first.')
+    regressions = compare(
+        report, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if regressions:
+        sys.exit(1)
+    print('No regressions.')
+
+
+if __name__ == '__main__':
+    main()
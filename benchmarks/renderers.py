@@ -0,0 +1,92 @@
+"""
+Compare FastJSONRenderer with DRF JSONRenderer on title and review pages.
+
+Seeds a throwaway SQLite database with generatedata, serializes a page
+of titles and a page of reviews of the most reviewed title once and
+times rendering them with both renderers:
+
+    python benchmarks/renderers.py --reviews 10000 --rows 100
+
+Both renderers are checked to produce the same bytes before timing.
+Without orjson installed FastJSONRenderer is JSONRenderer itself.
+"""
+import argparse
+import timeit
+
+from endpoints import seed
+
+
+def get_pages(rows):
+    from django.db.models import Count
+
+    from api.serializers import ReviewSerializer, TitleReadSerializer
+    from reviews.models import Review, Title
+
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    )[:rows]
+    title = Title.objects.annotate(
+        total=Count('reviews')
+    ).order_by('-total').first()
+    reviews = Review.objects.filter(title=title).select_related('author')
+    return (
+        ('titles', TitleReadSerializer(titles, many=True).data),
+        ('reviews', ReviewSerializer(reviews[:rows], many=True).data),
+    )
+
+
+def run(rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from api import renderers
+    from api.renderers import FastJSONRenderer
+
+    if renderers.orjson is None:
+        print('orjson is not installed, FastJSONRenderer falls back.')
+    for name, data in get_pages(rows):
+        results = {}
+        outputs = {}
+        for renderer_name, renderer in (
+            ('json', JSONRenderer()), ('fast', FastJSONRenderer()),
+        ):
+            outputs[renderer_name] = renderer.render(data)
+            results[renderer_name] = min(timeit.repeat(
+                lambda: renderer.render(data), number=1, repeat=repeat
+            ))
+        if outputs['json'] != outputs['fast']:
+            raise SystemExit(f'{name}: outputs differ')
+        print(
+            f'{name:<8} rows={len(data):<5} '
+            f'bytes={len(outputs["json"]):<7} '
+            f'json={results["json"] * 1000:.3f}ms '
+            f'fast={results["fast"] * 1000:.3f}ms '
+            f'speedup={results["json"] / results["fast"]:.1f}x'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--reviews', type=int, default=10_000)
+    parser.add_argument(
+        '--rows', type=int, default=100, help='Rows rendered per page.'
+    )
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    import os
+    import django
+    from django.db import connection
+
+    django.setup()
+    database = seed(args.reviews)
+    try:
+        run(args.rows, args.repeat)
+    finally:
+        connection.close()
+        os.unlink(database)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare compiled read serializers with ModelSerializer.to_representation.
+
+Seeds a throwaway SQLite database with generatedata, loads rows of every
+compiled serializer once and times rendering them both ways:
+
+    python benchmarks/serializers.py --reviews 10000 --rows 100
+
+Output of both ways is checked to be the same JSON before timing.
+"""
+import argparse
+import timeit
+
+from endpoints import seed
+
+
+def get_targets():
+    from api.serializers import (
+        CategorySerializer,
+        CommentSerializer,
+        GenreSerializer,
+        ReviewSerializer,
+        TitleReadSerializer,
+    )
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    return (
+        (CategorySerializer, Category.objects.all()),
+        (GenreSerializer, Genre.objects.all()),
+        (
+            TitleReadSerializer,
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ),
+        ),
+        (ReviewSerializer, Review.objects.select_related('author')),
+        (CommentSerializer, Comment.objects.select_related('author')),
+    )
+
+
+def render(serializer_class, rows):
+    from rest_framework.renderers import JSONRenderer
+
+    return JSONRenderer().render(serializer_class(rows, many=True).data)
+
+
+def time_render(serializer_class, rows, repeat):
+    return min(timeit.repeat(
+        lambda: serializer_class(rows, many=True).data,
+        number=1, repeat=repeat,
+    ))
+
+
+def run(rows, repeat):
+    from rest_framework import serializers
+    from api.representation import CompiledRepresentationMixin
+
+    compiled = CompiledRepresentationMixin.to_representation
+    for serializer_class, queryset in get_targets():
+        page = list(queryset[:rows])
+        results = {}
+        outputs = {}
+        for name, method in (
+            ('drf', serializers.ModelSerializer.to_representation),
+            ('compiled', compiled),
+        ):
+            CompiledRepresentationMixin.to_representation = method
+            outputs[name] = render(serializer_class, page)
+            results[name] = time_render(serializer_class, page, repeat)
+        CompiledRepresentationMixin.to_representation = compiled
+        if outputs['drf'] != outputs['compiled']:
+            raise SystemExit(f'{serializer_class.__name__}: outputs differ')
+        print(
+            f'{serializer_class.__name__:<20} rows={len(page):<5} '
+            f'drf={results["drf"] * 1000:.3f}ms '
+            f'compiled={results["compiled"] * 1000:.3f}ms '
+            f'speedup={results["drf"] / results["compiled"]:.1f}x'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--reviews', type=int, default=10_000)
+    parser.add_argument(
+        '--rows', type=int, default=100, help='Rows rendered per call.'
+    )
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    import os
+    import django
+    from django.db import connection
+
+    django.setup()
+    database = seed(args.reviews)
+    try:
+        run(args.rows, args.repeat)
+    finally:
+        connection.close()
+        os.unlink(database)
+
+
+if __name__ == '__main__':
+    main()
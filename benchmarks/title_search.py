@@ -0,0 +1,128 @@
+"""
+Compare title search through FTS5 with the icontains filter.
+
+Seeds a throwaway SQLite database with synthetic titles and times the
+first page plus pagination count of /titles/ queries for both paths:
+
+    python benchmarks/title_search.py --titles 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'на', 'то', 'ле', 'ва', 'до', 'сё', 'жи', 'ту', 'ма',
+    'не', 'ри', 'зо', 'бу', 'ша', 'го', 'ля', 'пе',
+)
+# Common, rare and mixed-case words planted into the vocabulary.
+WORDS = ('море', 'ёжик', 'туман', 'звезда', 'night')
+TERMS = ('море', 'Ёжик', 'ТУМАН', 'звезд', 'night')
+VOCABULARY_SIZE = 20_000
+PAGE_SIZE = 6
+BATCH_SIZE = 50_000
+
+
+def make_vocabulary():
+    vocabulary = {
+        ''.join(random.choices(SYLLABLES, k=random.randint(2, 4)))
+        for _ in range(VOCABULARY_SIZE)
+    }
+    return [*vocabulary, *WORDS]
+
+
+def seed(connection, count):
+    vocabulary = make_vocabulary()
+    # Zipf-like word frequencies: a few words are common, most are rare.
+    weights = list(accumulate(
+        1 / rank for rank in range(1, len(vocabulary) + 1)
+    ))
+    random.shuffle(vocabulary)
+    rows = (
+        (
+            ' '.join(
+                random.choices(vocabulary, cum_weights=weights, k=3)
+            ).capitalize(),
+            random.randint(1900, 2023),
+            ' '.join(random.choices(vocabulary, cum_weights=weights, k=12)),
+        )
+        for _ in range(count)
+    )
+    with connection.cursor() as cursor:
+        while True:
+            batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+            if not batch:
+                break
+            cursor.executemany(
+                'INSERT INTO reviews_title '
+                '(name, year, description, score_sum, score_count) '
+                'VALUES (%s, %s, %s, 0, 0)',
+                batch,
+            )
+
+
+def measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        queryset.count()
+        list(queryset[:PAGE_SIZE])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    database = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+    settings.DATABASES['default']['NAME'] = database.name
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    from reviews.models import Title
+    from reviews.search import search_titles
+
+    call_command('migrate', verbosity=0)
+    start = time.perf_counter()
+    with transaction.atomic():
+        seed(connection, args.titles)
+    print(f'Seeded {args.titles} titles in {time.perf_counter() - start:.1f}s')
+
+    print(
+        f'{"term":<8} {"icontains, ms":>14} {"matches":>9} '
+        f'{"fts5, ms":>10} {"matches":>9}'
+    )
+    for term in TERMS:
+        icontains = Title.objects.filter(
+            name__icontains=term
+        ).order_by('-rating', 'name')
+        fts = search_titles(Title.objects.all(), term).order_by(
+            'search_rank', 'id'
+        )
+        print(
+            f'{term:<8} {measure(icontains, args.repeat):>14.1f} '
+            f'{icontains.count():>9} '
+            f'{measure(fts, args.repeat):>10.1f} {fts.count():>9}'
+        )
+    connection.close()
+    os.unlink(database.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+
+
+@pytest.fixture(scope='session', autouse=True)
+def cache_location(tmp_path_factory):
+    """Keep the cache shared by test processes apart from the real one."""
+    from django.conf import settings
+
+    location = str(tmp_path_factory.mktemp('cache'))
+    settings_caches = {
+        'default': {**settings.CACHES['default'], 'LOCATION': location},
+        'responses': {
+            **settings.CACHES['responses'],
+            'LOCATION': os.path.join(location, 'responses'),
+        },
+    }
+    with pytest.MonkeyPatch.context() as patch, override_settings(
+        CACHES=settings_caches
+    ):
+        # Inherited by processes started with tests.utils.run_in_process.
+        patch.setenv('CACHE_LOCATION', location)
+        yield location
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
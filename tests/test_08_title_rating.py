@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user,
+                                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        review = create_single_review(user_client, title_id, 'text', 4).json()
+        create_single_review(moderator_client, title_id, 'text', 8)
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(f'{url}{review["id"]}/', data={'score': 10})
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+        moderator_review = admin_client.get(url).json()['results'][0]
+        admin_client.delete(f'{url}{moderator_review["id"]}/')
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`.'
+        )
+
+    def test_02_ordering_by_stored_rating(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'text', 7)
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+
+        response = admin_client.get('/api/v1/titles/?ordering=-rating')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name'], titles[0]['name']], (
+            'Проверьте, что произведения сортируются по рейтингу.'
+        )
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?genre=drama',
+    '/api/v1/titles/?category=films',
+    '/api/v1/titles/?ordering=name',
+    '/api/v1/titles/?ordering=-rating',
+    '/api/v1/titles/{id}/',
+)
+
+
+def create_titles(count):
+    category = Category.objects.get_or_create(name='Фильм', slug='films')[0]
+    genres = [
+        Genre.objects.get_or_create(name=name, slug=slug)[0]
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+    ]
+    titles = []
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, response.content
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_01_title_queries_do_not_grow(self, client, url):
+        title = create_titles(1)[0]
+        url = url.format(id=title.id)
+        expected = count_queries(client, url)
+        create_titles(10)
+        assert count_queries(client, url) == expected, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{url}` не зависит от количества произведений: связанные '
+            'категории и жанры должны загружаться заранее.'
+        )
+
+    def test_02_title_list_query_count(self, client,
+                                       django_assert_num_queries):
+        create_titles(10)
+        # COUNT for pagination, the page itself and one genre prefetch.
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/')
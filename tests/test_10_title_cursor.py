@@ -0,0 +1,124 @@
+import base64
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from reviews.models import Review, Title, User
+
+
+def crawl(client, url):
+    names = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, response.content
+        data = response.json()
+        assert set(data) == {'next', 'results'}, (
+            'Проверьте, что в режиме курсорной пагинации ответ содержит '
+            'только ключи `next` и `results`.'
+        )
+        names.extend(title['name'] for title in data['results'])
+        url = data['next']
+    return names
+
+
+def forge_cursor(next_url, position):
+    """Replace the position of the cursor in next_url."""
+    cursor = parse_qs(urlsplit(next_url).query)['cursor'][0]
+    data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    data['p'] = position
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursor:
+
+    @pytest.fixture
+    def titles(self, admin):
+        titles = [
+            Title.objects.create(name=f'Произведение {number % 5}', year=2000)
+            for number in range(20)
+        ]
+        for number, title in enumerate(titles[:12]):
+            Review.objects.create(
+                title=title, author=admin, text='text', score=number % 4 + 1
+            )
+        return titles
+
+    @pytest.mark.parametrize('ordering', ('', '-rating', 'rating', '-name'))
+    def test_01_cursor_crawl_matches_ordering(self, client, titles, ordering):
+        expected = [
+            title.name for title in Title.objects.order_by(
+                *(ordering or 'name').split(','), 'id'
+            )
+        ]
+        url = '/api/v1/titles/?cursor='
+        if ordering:
+            url += f'&ordering={ordering}'
+        assert crawl(client, url) == expected, (
+            'Проверьте, что обход `/api/v1/titles/` в режиме курсорной '
+            'пагинации возвращает каждое произведение ровно один раз и в '
+            'порядке сортировки.'
+        )
+
+    def test_02_cursor_ignores_inserts_before_position(self, client, titles):
+        first_page = client.get('/api/v1/titles/?cursor=').json()
+        Title.objects.create(name='Новое произведение', year=2000)
+        second_page = client.get(first_page['next']).json()
+        served = {title['id'] for title in first_page['results']}
+        assert not served & {title['id'] for title in second_page['results']}
+
+    def test_03_default_crawl_survives_reviews(self, client, titles, user):
+        url = '/api/v1/titles/?cursor='
+        first_page = client.get(url).json()
+        served = {title['id'] for title in first_page['results']}
+        # Top rating for a title the crawl has not reached yet.
+        unserved = Title.objects.exclude(pk__in=served).order_by('-name')[0]
+        Review.objects.create(
+            title=unserved, author=user, text='text', score=10
+        )
+        ids = [title['id'] for title in first_page['results']]
+        url = first_page['next']
+        while url:
+            data = client.get(url).json()
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        assert sorted(ids) == sorted(title.pk for title in titles), (
+            'Проверьте, что новый отзыв во время обхода не приводит к '
+            'пропуску или повтору произведений.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('url,position', (
+        ('reviews/?cursor=', ['garbage', 1]),
+        ('reviews/?cursor=', [{'a': 1}, 1]),
+        ('reviews/?cursor=', [None, 'x']),
+        ('reviews/?cursor=', 'ab'),
+        ('?ordering=name&cursor=', ['a', 'zz']),
+        ('?ordering=-rating&cursor=', ['high', 'a', 1]),
+        ('?ordering=name&cursor=', [1]),
+    ))
+    def test_05_forged_cursor_values(self, client, titles, url, position):
+        title = titles[0]
+        for number in range(6):
+            Review.objects.create(
+                title=title, text='text', score=5,
+                author=User.objects.create(
+                    username=f'reader{number}',
+                    email=f'reader{number}@yamdb.fake',
+                ),
+            )
+        url = (
+            f'/api/v1/titles/{title.pk}/{url}' if url.startswith('reviews')
+            else f'/api/v1/titles/{url}'
+        )
+        next_url = client.get(url).json()['next']
+        response = client.get(url + forge_cursor(next_url, position))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор с подделанными значениями позиции '
+            f'отклоняется ответом 404: `{url}`.'
+        )
@@ -0,0 +1,146 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import cache as response_cache
+from reviews.models import Category, Review, Title
+from tests.utils import create_categories, create_titles, run_in_process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/?ordering=name&year=1984',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    ))
+    def test_01_repeated_get_is_served_from_cache(
+        self, admin_client, client, django_assert_num_queries, url
+    ):
+        create_titles(admin_client)
+        response = client.get(url)
+        with django_assert_num_queries(0):
+            cached_response = client.get(url)
+        assert cached_response.json() == response.json(), (
+            f'Проверьте, что повторный GET-запрос к `{url}` возвращает '
+            'данные из кэша без обращения к БД.'
+        )
+        reordered_url = url.replace(
+            'ordering=name&year=1984', 'year=1984&ordering=name'
+        )
+        with django_assert_num_queries(0):
+            client.get(reordered_url)
+
+    def test_02_api_write_invalidates_cache(self, admin_client, client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == 2
+        admin_client.delete(f'{url}films/')
+        assert client.get(url).json()['count'] == 1, (
+            f'Проверьте, что изменение данных через API сбрасывает кэш '
+            f'ответов `{url}`.'
+        )
+
+    def test_03_orm_write_invalidates_cache(self, admin_client, client,
+                                            admin):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['category']['name'] == 'Фильм'
+
+        Category.objects.filter(slug='films').get().delete()
+        assert client.get(url).json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведений.'
+        )
+
+        Review.objects.create(
+            title=Title.objects.get(pk=titles[0]['id']),
+            author=admin,
+            text='text',
+            score=7,
+        )
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений.'
+        )
+
+    def test_04_bulk_write_in_other_process_invalidates_cache(
+        self, admin_client, client
+    ):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == 2
+        # bulk_create skips the signals, as management commands do.
+        Category.objects.bulk_create([Category(name='Музыка', slug='music')])
+        run_in_process(
+            'from api.cache import bump_bulk_writes\n'
+            'bump_bulk_writes()'
+        )
+        assert client.get(url).json()['count'] == 3, (
+            'Проверьте, что версии кэша общие для всех процессов и что '
+            'массовая запись из другого процесса сбрасывает кэш ответов.'
+        )
+
+    def test_05_counters_are_atomic_across_processes(self):
+        cache.add('counter', 0, timeout=60)
+        code = (
+            'from django.core.cache import cache\n'
+            'for _ in range(50):\n'
+            '    cache.incr("counter")'
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(run_in_process, [code] * 4))
+        assert cache.get('counter') == 200, (
+            'Проверьте, что счётчики кэша не теряют увеличений из '
+            'разных процессов.'
+        )
+        cache.set('counter', 0, timeout=1)
+        cache.incr('counter')
+        time.sleep(1.1)
+        assert cache.get('counter') is None, (
+            'Проверьте, что увеличение счётчика не продлевает его срок.'
+        )
+
+    def test_06_unknown_query_params_bypass_cache(self, admin_client,
+                                                  client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        client.get(url)
+        cache_files = len(response_cache._list_cache_files())
+        for number in range(3):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(f'{url}?junk={number}')
+            assert response.status_code == HTTPStatus.OK
+            assert context.captured_queries, (
+                'Проверьте, что ответы на запросы с неизвестными '
+                'параметрами не берутся из кэша.'
+            )
+            assert 'ETag' not in response
+        assert len(response_cache._list_cache_files()) == cache_files, (
+            'Проверьте, что неизвестные параметры запроса не создают '
+            'записей в кэше ответов.'
+        )
+
+    def test_07_cache_key_ignores_host(self, client,
+                                       django_assert_num_queries):
+        Category.objects.bulk_create(
+            Category(name=f'Категория {number}', slug=f'category-{number}')
+            for number in range(8)
+        )
+        url = '/api/v1/categories/'
+        response = client.get(url, HTTP_HOST='first.example')
+        assert response.json()['next'].startswith('http://first.example/')
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_HOST='second.example')
+        assert response.json()['next'] == (
+            'http://second.example/api/v1/categories/?page=2'
+        ), (
+            'Проверьте, что ссылки в закэшированном ответе строятся '
+            'для хоста запроса.'
+        )
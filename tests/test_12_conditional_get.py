@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def check_not_modified(self, client, url, django_assert_num_queries,
+                           queries=0):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'строгий заголовок `ETag`.'
+        )
+        with django_assert_num_queries(queries):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        return etag
+
+    def test_01_read_endpoints(self, admin_client, user_client, user, client,
+                               django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        for url in (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            title_url,
+            f'{title_url}reviews/',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+        ):
+            self.check_not_modified(client, url, django_assert_num_queries)
+        # Token authentication still loads the user.
+        self.check_not_modified(
+            user_client, '/api/v1/users/me/', django_assert_num_queries, 1
+        )
+
+    def test_02_write_changes_etag(self, admin_client, user_client, user,
+                                   client, django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = self.check_not_modified(
+            client, url, django_assert_num_queries
+        )
+        user_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'new'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения отзыва GET-запрос к `{url}` со '
+            'старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        assert response.get('ETag') != etag
+
+        etag = self.check_not_modified(
+            user_client, '/api/v1/users/me/', django_assert_num_queries, 1
+        )
+        user_client.patch('/api/v1/users/me/', data={'bio': 'new bio'})
+        response = user_client.get(
+            '/api/v1/users/me/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == 'new bio'
+
+    def test_03_only_renames_change_note_etags(
+        self, admin_client, user_client, user, client,
+        django_assert_num_queries
+    ):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = self.check_not_modified(
+            client, url, django_assert_num_queries
+        )
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        user_client.patch('/api/v1/users/me/', data={'bio': 'new bio'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация и изменение пользователя без смены '
+            f'имени не сбрасывают `ETag` отзывов `{url}`.'
+        )
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что смена имени автора сбрасывает `ETag` `{url}`.'
+        )
+        authors = {review['author'] for review in response.json()['results']}
+        assert 'renamed' in authors
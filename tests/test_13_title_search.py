@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', {'search': text})
+    assert response.status_code == HTTPStatus.OK, response.content
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+
+    @pytest.fixture
+    def titles(self):
+        return [
+            Title.objects.create(
+                name='Поле', year=2000, description='Немного про море.'
+            ),
+            Title.objects.create(
+                name='Море', year=2000, description='Море, море, море.'
+            ),
+            Title.objects.create(name='Ёжик в тумане', year=1975),
+        ]
+
+    def test_01_search_is_case_insensitive_for_cyrillic(self, client, titles):
+        for text in ('ЁЖИК', 'ежик', 'Туман', 'ёж тум'):
+            assert search(client, text) == ['Ёжик в тумане'], (
+                'Проверьте, что параметр `search` эндпоинта `/api/v1/titles/` '
+                'ищет по началу слов без учёта регистра, в том числе для '
+                'кириллицы.'
+            )
+        assert search(client, '%') == []
+
+    def test_02_search_is_ranked(self, client, titles):
+        assert search(client, 'море') == ['Море', 'Поле'], (
+            'Проверьте, что результаты поиска по `/api/v1/titles/` '
+            'упорядочены по релевантности.'
+        )
+        assert search(client, 'море') != search(client, 'море&ordering=name')
+
+    def test_03_index_follows_writes(self, client, titles):
+        Title.objects.filter(pk=titles[2].pk).update(name='Ёжик в лесу')
+        assert search(client, 'лес') == ['Ёжик в лесу']
+        assert search(client, 'туман') == []
+        titles[1].delete()
+        assert search(client, 'море') == ['Поле'], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_04_rebuild_command(self, client, titles):
+        call_command('rebuild_title_search')
+        assert search(client, 'море') == ['Море', 'Поле']
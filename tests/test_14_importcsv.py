@@ -0,0 +1,134 @@
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models.deletion import Collector
+from django.db.models import Avg
+
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    Tombstone,
+    User,
+)
+from reviews.management.commands import importcsv
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ImportCsv:
+
+    def test_01_import_all_tables(self, capsys):
+        call_command('importcsv', workers=3)
+        counts = [
+            model.objects.count()
+            for model in (User, Category, Genre, Title, GenreTitle, Review,
+                          Comment)
+        ]
+        assert counts == [5, 3, 15, 32, 42, 72, 3], (
+            'Проверьте, что команда `importcsv` загружает все CSV-файлы.'
+        )
+        assert dict(Title.objects.values_list('id', 'rating')) == dict(
+            Title.objects.annotate(
+                average=Avg('reviews__score')
+            ).values_list('id', 'average')
+        ), (
+            'Проверьте, что после импорта отзывов рейтинги произведений '
+            'пересчитываются.'
+        )
+        assert 'Total import time' in capsys.readouterr().out
+
+    def test_02_incremental_sync(self, tmp_path, monkeypatch, capsys):
+        call_command('importcsv')
+        data = tmp_path / 'data'
+        shutil.copytree(importcsv.PATH, data)
+        monkeypatch.setattr(importcsv, 'PATH', f'{data}/')
+        capsys.readouterr()
+
+        call_command('importcsv', incremental=True)
+        out = capsys.readouterr().out
+        assert (
+            'titles.csv: 0 inserted, 0 updated, 32 unchanged, 0 deleted'
+            in out
+        ), (
+            'Проверьте, что повторная синхронизация тех же файлов '
+            'не изменяет строки.'
+        )
+
+        (data / 'category.csv').write_text(
+            'id,name,slug\n'
+            '1,Кино,movie\n'
+            '2,Книга,book\n'
+            '4,Игра,game\n',
+            encoding='utf-8',
+        )
+        call_command('importcsv', incremental=True, delete=True)
+        out = capsys.readouterr().out
+        assert (
+            'category.csv: 1 inserted, 1 updated, 1 unchanged, 1 deleted'
+            in out
+        ), 'Проверьте подсчёт строк в режиме `--incremental`.'
+        assert dict(Category.objects.values_list('id', 'name')) == {
+            1: 'Кино', 2: 'Книга', 4: 'Игра'
+        }
+        assert Title.objects.count() == 32, (
+            'Проверьте, что синхронизация не удаляет произведения, '
+            'которые есть в файле.'
+        )
+
+    def test_03_delete_requires_incremental(self):
+        with pytest.raises(CommandError):
+            call_command('importcsv', delete=True)
+
+
+    def test_04_import_invalidates_cache(self, client):
+        url = '/api/v1/titles/?count=approximate'
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        assert client.get(url).json()['count'] == 0
+        call_command('importcsv')
+        assert client.get('/api/v1/titles/').json()['count'] == 32, (
+            'Проверьте, что после импорта кеш ответов сбрасывается.'
+        )
+        assert client.get(url).json()['count'] == 32, (
+            'Проверьте, что после импорта счётчики объектов сбрасываются.'
+        )
+
+    def test_05_purge_without_collector(self, monkeypatch):
+        call_command('importcsv')
+        deleted = sum(
+            model.objects.count() for model in (Title, Review, Comment)
+        )
+
+        def collect(*args, **kwargs):
+            raise AssertionError('Collector.collect() is called')
+
+        monkeypatch.setattr(Collector, 'collect', collect)
+        assert importcsv.import_csv('titles.csv', Title, clear=True) == 32
+        assert (
+            Review.objects.count(), Comment.objects.count(),
+            GenreTitle.objects.count(),
+        ) == (0, 0, 0), (
+            'Проверьте, что очистка таблицы удаляет зависимые строки.'
+        )
+        assert Tombstone.objects.count() == deleted, (
+            'Проверьте, что очистка таблиц попадает в ленту изменений.'
+        )
+        assert importcsv.import_csv('review.csv', Review) == 72
+        Title.objects.refresh_scores()
+        assert Title.objects.filter(rating__isnull=False).exists()
+        importcsv.purge_model(Category)
+        assert not Title.objects.filter(category__isnull=False).exists()
+        importcsv.purge_model(Review)
+        assert not Title.objects.filter(rating__isnull=False).exists(), (
+            'Проверьте, что очистка отзывов сбрасывает рейтинги.'
+        )
+
+    def test_06_single_writer_on_sqlite(self):
+        scheduler = importcsv.ImportScheduler(importcsv.TABLES, workers=3)
+        assert scheduler.workers == 1, (
+            'Проверьте, что на SQLite таблицы загружаются по одной.'
+        )
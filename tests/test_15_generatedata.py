@@ -0,0 +1,80 @@
+import filecmp
+import os
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Avg, Count
+
+from reviews.management.commands import generatedata
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15GenerateData:
+
+    def test_01_generate_into_database(self):
+        call_command('generatedata', reviews=2000, seed=1)
+        assert Review.objects.count() == 2000
+        assert Comment.objects.count() == 1000
+        assert Title.objects.count() == 200
+        assert User.objects.count() >= 400
+        review_counts = sorted(
+            Title.objects.annotate(
+                total=Count('reviews')
+            ).values_list('total', flat=True),
+            reverse=True,
+        )
+        median = review_counts[len(review_counts) // 2]
+        assert review_counts[0] > 10 * median, (
+            'Проверьте, что число отзывов на произведение распределено '
+            'по закону Ципфа.'
+        )
+        assert dict(Title.objects.values_list('id', 'rating')) == dict(
+            Title.objects.annotate(
+                average=Avg('reviews__score')
+            ).values_list('id', 'average')
+        ), 'Проверьте, что после генерации рейтинги пересчитываются.'
+        assert Review.objects.values('pub_date').distinct().count() > 1, (
+            'Проверьте, что даты отзывов берутся из сгенерированных данных.'
+        )
+        dates = [review.pub_date for review in Review.objects.all()[:100]]
+        assert all(
+            date.tzinfo and 2000 <= date.year <= 2022 for date in dates
+        ), 'Проверьте, что даты отзывов сохраняются в БД в формате UTC.'
+        assert Review.objects.filter(pub_date__year=dates[0].year).exists()
+
+    def test_02_generate_csv_for_importcsv(self, tmp_path):
+        call_command(
+            'generatedata', reviews=500, seed=1, output=str(tmp_path)
+        )
+        assert Review.objects.count() == 0
+        call_command('importcsv', path=str(tmp_path))
+        assert Review.objects.count() == 500
+        assert Comment.objects.count() == 250
+
+    def test_03_wrong_reviews(self):
+        with pytest.raises(CommandError):
+            call_command('generatedata', reviews=0)
+
+    @pytest.mark.parametrize('with_numpy', (True, False))
+    def test_04_seed_repeats_dataset(self, tmp_path, monkeypatch,
+                                     with_numpy):
+        if not with_numpy:
+            monkeypatch.setattr(generatedata, 'numpy', None)
+        first, second = tmp_path / 'first', tmp_path / 'second'
+        for output in (first, second):
+            call_command(
+                'generatedata', reviews=500, seed=1, output=str(output)
+            )
+        filenames = os.listdir(first)
+        _, mismatch, errors = filecmp.cmpfiles(
+            first, second, filenames, shallow=False
+        )
+        assert not mismatch and not errors, (
+            'Проверьте, что генерация с одним и тем же `seed` повторяет '
+            'данные, с numpy и без него.'
+        )
+        call_command('importcsv', path=str(first))
+        assert Review.objects.count() == 500
+        assert Comment.objects.count() == 250
@@ -0,0 +1,81 @@
+import socket
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def signup(self, client, number):
+        return client.post(self.url_signup, data={
+            'email': f'outbox{number}@yamdb.fake',
+            'username': f'outbox{number}',
+        })
+
+    def test_01_signup_does_not_wait_for_mail(self, client, smtp_server):
+        response = self.signup(client, 1)
+        assert response.status_code == 200
+        assert smtp_server.messages == [], (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время запроса.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'outbox1@yamdb.fake'
+        assert email.sent is None
+
+        call_command('sendoutbox')
+        assert len(smtp_server.messages) == 1
+        email.refresh_from_db()
+        assert email.sent is not None
+        assert email.message.split()[-1] in smtp_server.messages[0], (
+            'Проверьте, что письмо содержит код подтверждения.'
+        )
+
+    def test_02_batch_uses_one_connection(self, client, smtp_server):
+        for number in range(3):
+            self.signup(client, number)
+        call_command('sendoutbox', batch_size=2)
+        assert len(smtp_server.messages) == 3
+        assert smtp_server.connections == 1, (
+            'Проверьте, что письма отправляются через одно соединение.'
+        )
+
+    def test_03_retry_with_backoff(self, client, smtp_server, settings):
+        smtp_port = settings.EMAIL_PORT
+        settings.EMAIL_PORT = get_free_port()
+        self.signup(client, 1)
+        call_command('sendoutbox')
+        email = OutboxEmail.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert email.error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается.'
+        )
+
+        settings.EMAIL_PORT = smtp_port
+        call_command('sendoutbox')
+        assert smtp_server.messages == [], (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+        OutboxEmail.objects.update(
+            send_after=timezone.now() - timedelta(seconds=1)
+        )
+        call_command('sendoutbox')
+        email.refresh_from_db()
+        assert len(smtp_server.messages) == 1
+        assert email.attempts == 2
+        assert email.sent is not None
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication
+from api.authentication import UserAccessToken, token_version_key
+from api.confirmation import issue_confirmation_code
+from tests.utils import create_single_review, create_titles, run_in_process
+
+
+class MissingCache:
+    """Cache read by a request that missed just before a write."""
+
+    def get(self, key):
+        return None
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {UserAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17StatelessAuth:
+    url_categories = '/api/v1/categories/'
+
+    def test_01_token_carries_role(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': issue_confirmation_code(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == user.role
+        assert token['ver'] == user.token_version
+
+    def test_02_permission_check_without_user_query(self, admin):
+        client = token_client(admin)
+        client.post(self.url_categories, data={})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_categories, data={})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert context.captured_queries == [], (
+            'Проверьте, что проверка прав администратора не загружает '
+            'пользователя из базы данных.'
+        )
+
+    def test_03_role_change_revokes_token(self, admin_client, user):
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'new bio'}
+        )
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение профиля не отзывает токены.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение роли отзывает выданные токены.'
+        )
+
+        user.refresh_from_db()
+        response = token_client(user).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['role'] == 'moderator'
+
+    def test_04_deleted_user_token(self, admin_client, user):
+        client = token_client(user)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_05_token_user_as_author(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        client = token_client(user)
+        review = create_single_review(
+            client, titles[0]['id'], 'text', 5
+        ).json()
+        assert review['author'] == user.username
+        response = client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/',
+            data={'text': 'new text'},
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+
+    def test_06_role_change_reaches_other_processes(self, admin_client,
+                                                    user):
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        user.refresh_from_db()
+        cached = run_in_process(
+            'from django.core.cache import cache\n'
+            'from api.authentication import token_version_key\n'
+            f'print(cache.get(token_version_key({user.pk})))'
+        )
+        assert cached.strip() == str(user.token_version), (
+            'Проверьте, что после смены роли новая версия токенов видна '
+            'всем процессам API через общий кэш.'
+        )
+
+    def test_07_miss_does_not_overwrite_new_version(self, user,
+                                                    monkeypatch):
+        key = token_version_key(user.pk)
+        cache.set(key, user.token_version + 1)
+        monkeypatch.setattr(authentication, 'cache', MissingCache())
+        assert authentication.get_token_version(user.pk) == (
+            user.token_version
+        )
+        assert cache.get(key) == user.token_version + 1, (
+            'Проверьте, что версия токенов, прочитанная из БД при промахе '
+            'кэша, не затирает новую версию, записанную при изменении '
+            'пользователя.'
+        )
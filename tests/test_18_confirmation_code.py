@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import confirmation
+from tests.utils import drop_process_cache
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def get_written_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(WRITE_STATEMENTS)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConfirmationCode:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    signup_data = {'username': 'coder', 'email': 'coder@yamdb.fake'}
+
+    def signup(self, client):
+        client.post(self.url_signup, data=self.signup_data)
+        call_command('sendoutbox')
+        return mail.outbox[-1].body.split()[-1]
+
+    def get_token(self, client, code):
+        return client.post(self.url_token, data={
+            'username': self.signup_data['username'],
+            'confirmation_code': code,
+        })
+
+    def test_01_code_is_single_use(self, client):
+        code = self.signup(client)
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK
+        assert get_written_queries(context) == [], (
+            'Проверьте, что получение токена не изменяет базу данных.'
+        )
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать один раз.'
+        )
+
+    def test_02_wrong_code_burns_code_without_writes(self, client):
+        code = self.signup(client)
+        wrong_code = str((int(code) + 1) % 10 ** len(code)).zfill(len(code))
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_token(client, wrong_code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert get_written_queries(context) == [], (
+            'Проверьте, что неудачная попытка получить токен не изменяет '
+            'базу данных.'
+        )
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что неудачная попытка сбрасывает код подтверждения.'
+
+    def test_03_new_signup_replaces_code(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        if old_code != new_code:
+            assert self.get_token(client, old_code).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+            new_code = self.signup(client)
+        assert self.get_token(client, new_code).status_code == HTTPStatus.OK
+
+    def test_04_code_expires(self, client, monkeypatch):
+        monkeypatch.setattr(confirmation, 'CONFIRMATION_CODE_TIMEOUT', 0)
+        code = self.signup(client)
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код подтверждения действует ограниченное время.'
+
+    def test_05_code_survives_other_process(self, client):
+        code = self.signup(client)
+        drop_process_cache()
+        assert self.get_token(client, code).status_code == HTTPStatus.OK, (
+            'Проверьте, что коды подтверждения хранятся в общем кэше и '
+            'доступны другим процессам и после перезапуска.'
+        )
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import SlidingWindowThrottle
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [3600 * 1000]
+    monkeypatch.setattr(
+        SlidingWindowThrottle, 'timer', staticmethod(lambda: now[0])
+    )
+    return now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19AuthThrottling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    def get_token(self, client, user, ip):
+        return client.post(
+            self.url_token,
+            data={'username': user.username, 'confirmation_code': '000000'},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_01_token_limit_per_username(self, client, user, clock):
+        for number in range(10):
+            response = self.get_token(client, user, f'10.0.0.{number}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        with CaptureQueriesContext(connection) as context:
+            response = self.get_token(client, user, '10.0.1.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что число попыток получить токен для одного '
+            '`username` ограничено.'
+        )
+        assert 'Retry-After' in response
+        assert context.captured_queries == [], (
+            'Проверьте, что отклонённый запрос не обращается к базе данных.'
+        )
+
+    def test_02_signup_limit_per_ip(self, client, clock):
+        for number in range(20):
+            response = client.post(self.url_signup, data={
+                'username': f'user{number}', 'email': 'invalid',
+            })
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.url_signup, data={
+            'username': 'user20', 'email': 'user20@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что число регистраций с одного IP ограничено.'
+        )
+        response = client.post(self.url_signup, data={
+            'username': 'user20', 'email': 'user20@yamdb.fake',
+        }, REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_sliding_window(self, client, user, clock):
+        for number in range(10):
+            self.get_token(client, user, f'10.0.0.{number}')
+        # Half of the previous hour is still inside the window.
+        clock[0] += 3600 * 1.5
+        for number in range(5):
+            response = self.get_token(client, user, f'10.0.2.{number}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.get_token(client, user, '10.0.3.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что ограничение учитывает запросы предыдущего окна.'
+        )
+        clock[0] += 3600
+        assert self.get_token(client, user, '10.0.4.1').status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+
+    def test_04_forwarded_for_is_ignored(self, client, clock):
+        for number in range(21):
+            response = client.post(self.url_signup, data={
+                'username': f'user{number}', 'email': 'invalid',
+            }, HTTP_X_FORWARDED_FOR=f'10.1.0.{number}')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подмена заголовка `X-Forwarded-For` не '
+            'обходит ограничение числа регистраций с одного IP.'
+        )
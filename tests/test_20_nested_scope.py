@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.settings import api_settings
+
+from api.serializers import REVIEW_DUPLICATE_ERROR
+from reviews.models import Review
+from tests.utils import (
+    create_single_comment,
+    create_single_review,
+    create_titles,
+)
+
+
+def loaded_columns(context, *columns):
+    """Return columns of parent rows selected by the captured queries."""
+    return [
+        column for column in columns
+        if any(column in query['sql'] for query in context.captured_queries)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20NestedScope:
+
+    def test_01_review_create_without_loading_title(self, admin_client,
+                                                    user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not loaded_columns(context, '"reviews_title"."name"'), (
+            'Проверьте, что при создании отзыва произведение не загружается '
+            'из БД: достаточно проверить, что оно существует.'
+        )
+
+    def test_02_duplicate_review_rejected_by_constraint(self, admin_client,
+                                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает 400.'
+        )
+        assert response.json() == {
+            api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_DUPLICATE_ERROR]
+        }, (
+            'Проверьте, что ошибка повторного отзыва возвращается в поле '
+            '`non_field_errors`, как ошибки валидации.'
+        )
+        assert Review.objects.count() == 1
+        create_single_review(admin_client, titles[0]['id'], 'Текст', 7)
+        assert Review.objects.count() == 2
+
+    def test_03_comment_list_without_loading_review(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review_id = create_single_review(
+            admin_client, titles[0]['id'], 'Текст', 5
+        ).json()['id']
+        create_single_comment(admin_client, titles[0]['id'], review_id, 'К')
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review_id}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 1
+        assert not loaded_columns(
+            context, '"reviews_title"."name"', '"reviews_review"."text"'
+        ), (
+            'Проверьте, что список комментариев фильтруется по `review_id` '
+            'и `title_id` без загрузки отзыва и произведения.'
+        )
+
+    def test_04_review_of_another_title(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review_id = create_single_review(
+            admin_client, titles[0]['id'], 'Текст', 5
+        ).json()['id']
+        comment_id = create_single_comment(
+            admin_client, titles[0]['id'], review_id, 'К'
+        ).json()['id']
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{review_id}/'
+        for path in ('', 'comments/', f'comments/{comment_id}/'):
+            response = admin_client.get(url + path)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url + path}` с отзывом '
+                'другого произведения возвращает 404.'
+            )
+        response = admin_client.post(url + 'comments/', data={'text': 'К'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title, User
+
+
+def crawl(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, response.content
+        data = response.json()
+        assert set(data) == {'next', 'results'}
+        ids.extend(note['id'] for note in data['results'])
+        url = data['next']
+    return ids
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21NoteCursor:
+
+    @pytest.fixture
+    def review(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        authors = [
+            User.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(15)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='text', score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='text'
+            )
+        # Equal dates check the id tie-breaker, microseconds the precision.
+        now = timezone.now().replace(microsecond=123456)
+        Review.objects.filter(
+            pk__in=[review.pk for review in reviews[:8]]
+        ).update(pub_date=now)
+        Comment.objects.filter(review=reviews[0]).update(pub_date=now)
+        return reviews[0]
+
+    def test_01_review_cursor_crawl(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        expected = list(Review.objects.order_by(
+            '-pub_date', 'id'
+        ).values_list('id', flat=True))
+        assert crawl(client, url + '?cursor=') == expected, (
+            f'Проверьте, что обход `{url}` в режиме курсорной пагинации '
+            'возвращает каждый отзыв ровно один раз в порядке `-pub_date`.'
+        )
+
+    def test_02_comment_cursor_crawl(self, client, review):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+        expected = list(Comment.objects.order_by(
+            '-pub_date', 'id'
+        ).values_list('id', flat=True))
+        assert crawl(client, url + '?cursor=') == expected, (
+            f'Проверьте, что обход `{url}` в режиме курсорной пагинации '
+            'возвращает каждый комментарий ровно один раз.'
+        )
+
+    def test_03_review_page_seeks_on_index(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/?cursor='
+        next_url = client.get(url).json()['next']
+        with CaptureQueriesContext(connection) as context:
+            client.get(next_url)
+        page_query = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'ORDER BY' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_query}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'review_title_pub_date_idx (title_id=? AND pub_date<?)' in (
+            plan
+        ), (
+            'Проверьте, что страница отзывов в режиме курсорной пагинации '
+            'читается поиском по индексу `(title, -pub_date, id)`.'
+        )
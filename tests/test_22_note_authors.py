@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, User
+
+USER_COLUMNS = ('"reviews_user"."password"', '"reviews_user"."bio"')
+
+
+def create_notes(review, numbers):
+    for number in numbers:
+        author = User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        Comment.objects.create(review=review, author=author, text='text')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NoteAuthors:
+
+    @pytest.fixture
+    def review(self, admin):
+        title = Title.objects.create(name='Произведение', year=2000)
+        return Review.objects.create(
+            title=title, author=admin, text='text', score=5
+        )
+
+    @pytest.mark.parametrize('path', ('', '?cursor='))
+    def test_01_comment_list_joins_only_username(self, client, review,
+                                                 path):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+        create_notes(review, range(1))
+        with CaptureQueriesContext(connection) as context:
+            client.get(url + path)
+        expected = len(context.captured_queries)
+        Comment.objects.all().delete()
+        create_notes(review, range(1, 6))
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url + path)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) == expected, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{url}` не зависит от числа авторов на странице.'
+        )
+        usernames = {
+            comment['author'] for comment in response.json()['results']
+        }
+        assert usernames == {f'author{number}' for number in range(1, 6)}
+        assert not any(
+            column in query['sql']
+            for query in context.captured_queries for column in USER_COLUMNS
+        ), (
+            'Проверьте, что для вывода автора из БД читается только его '
+            '`username`, а не вся строка пользователя.'
+        )
+
+    def test_02_review_detail_joins_only_username(self, client, review,
+                                                  admin):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['author'] == admin.username
+        assert len(context.captured_queries) == 1
+        assert not any(
+            column in context.captured_queries[0]['sql']
+            for column in USER_COLUMNS
+        )
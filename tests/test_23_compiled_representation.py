@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.representation import (
+    CompiledRepresentationMixin,
+    NotCompilable,
+    compile_serializer,
+)
+from api.serializers import (
+    CategorySerializer,
+    CommentSerializer,
+    GenreSerializer,
+    ReviewSerializer,
+    TitleReadSerializer,
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+SERIALIZERS = (
+    (CategorySerializer, Category.objects.all),
+    (GenreSerializer, Genre.objects.all),
+    (
+        TitleReadSerializer,
+        lambda: Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ),
+    ),
+    (ReviewSerializer, Review.objects.select_related('author').all),
+    (CommentSerializer, Comment.objects.select_related('author').all),
+)
+
+
+def render(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CompiledRepresentation:
+
+    @pytest.fixture
+    def data(self):
+        call_command('generatedata', reviews=300, seed=1, stdout=StringIO())
+        # Empty relations and NULL columns the generated rows do not have.
+        Title.objects.create(name='Без категории', year=2000)
+        Title.objects.create(
+            name='Без рейтинга', year=1999, description='Описание',
+            category=Category.objects.first(),
+        )
+
+    @pytest.mark.parametrize('serializer_class, get_queryset', SERIALIZERS)
+    def test_01_output_matches_serializer(self, data, monkeypatch,
+                                          serializer_class, get_queryset):
+        compiled = render(serializer_class, get_queryset())
+        monkeypatch.setattr(
+            CompiledRepresentationMixin,
+            'to_representation',
+            serializers.ModelSerializer.to_representation,
+        )
+        expected = render(serializer_class, get_queryset())
+        assert compiled == expected, (
+            f'Проверьте, что вывод {serializer_class.__name__} совпадает '
+            'побайтно с выводом ModelSerializer.'
+        )
+
+    def test_02_not_compilable_serializer_falls_back(self):
+        class MethodSerializer(
+            CompiledRepresentationMixin, serializers.ModelSerializer
+        ):
+            upper = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Genre
+                fields = ('name', 'upper')
+
+            def get_upper(self, genre):
+                return genre.name.upper()
+
+        with pytest.raises(NotCompilable):
+            compile_serializer(MethodSerializer())
+        genre = Genre(name='Драма', slug='drama')
+        assert MethodSerializer(genre).data == {
+            'name': 'Драма', 'upper': 'ДРАМА'
+        }
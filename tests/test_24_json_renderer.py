@@ -0,0 +1,74 @@
+import runpy
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api_yamdb import settings as project_settings
+from tests.utils import create_reviews
+
+DATA = {
+    'text': 'Строка с \u2028 и \u2029 внутри',
+    'date': datetime(2023, 4, 3, 20, 58, 1, 123456, tzinfo=timezone.utc),
+    'decimal': Decimal('1.50'),
+    'numbers': [0, -1, 2 ** 40, 1.5, None, True],
+    1: 'ключ-число',
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24JSONRenderer:
+
+    def test_01_same_output_as_json_renderer(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), 'Проверьте, что FastJSONRenderer выводит тот же JSON.'
+
+    def test_02_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+        assert FastJSONParser().parse(BytesIO(b'{"a": [1]}')) == {'a': [1]}
+
+    def test_03_indent_falls_back(self):
+        rendered = FastJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=2'
+        )
+        assert rendered == b'{\n  "a": 1\n}'
+
+    def test_04_api_pages_match(self, client, admin, admin_client,
+                                monkeypatch):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        )
+        fast = [client.get(url).content for url in urls]
+        monkeypatch.setattr(renderers, 'orjson', None)
+        for url, content in zip(urls, fast):
+            assert content == client.get(url).content
+
+    def test_05_parser(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": "Фильм", "slug": "films"}',
+            content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"a": NaN}'))
+
+    def test_06_json_only_setting(self, monkeypatch):
+        monkeypatch.setenv('JSON_ONLY', 'true')
+        renderer_classes = runpy.run_path(project_settings.__file__)[
+            'REST_FRAMEWORK'
+        ]['DEFAULT_RENDERER_CLASSES']
+        assert renderer_classes == ('api.renderers.FastJSONRenderer',), (
+            'Проверьте, что при JSON_ONLY браузерное API отключено.'
+        )
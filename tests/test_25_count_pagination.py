@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import cache
+from reviews.models import Comment, Review, Title, User
+
+
+def count_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25CountPagination:
+
+    @pytest.fixture
+    def titles(self):
+        return [
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+            for number in range(14)
+        ]
+
+    def test_01_countless_pages(self, client, titles):
+        url = '/api/v1/titles/?count=false'
+        names = []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                response = client.get(url)
+                assert response.status_code == HTTPStatus.OK
+                data = response.json()
+                assert set(data) == {'next', 'previous', 'results'}, (
+                    'Проверьте, что при `count=false` ответ не содержит '
+                    'ключ `count`.'
+                )
+                names.extend(title['name'] for title in data['results'])
+                url = data['next']
+        assert not count_queries(context), (
+            'Проверьте, что при `count=false` не выполняется COUNT-запрос.'
+        )
+        assert names == list(Title.objects.order_by(
+            '-rating', 'name'
+        ).values_list('name', flat=True))
+        assert data['previous'].endswith('count=false&page=2')
+        response = client.get('/api/v1/titles/?count=false&page=4')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?count=false&page=last')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert not count_queries(context), (
+            'Проверьте, что при `count=false` страница `last` отклоняется '
+            'без COUNT-запроса.'
+        )
+
+    def test_02_countless_browsable_api(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/?count=false', HTTP_ACCEPT='text/html'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_approximate_count_is_cached(self, admin_client, admin):
+        url = '/api/v1/users/?count=approximate&search=new'
+        assert admin_client.get(url).json()['count'] == 0
+        User.objects.create(username='new', email='new@yamdb.fake')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.json()['count'] == 0, (
+            'Проверьте, что при `count=approximate` число объектов берётся '
+            'из кеша.'
+        )
+        assert not count_queries(context)
+        response = admin_client.get('/api/v1/users/?search=new')
+        assert response.json()['count'] == 1
+        cache.clear()
+        assert admin_client.get(url).json()['count'] == 1
+
+    def test_04_approximate_review_count_from_title(self, client, titles,
+                                                    admin):
+        Review.objects.create(
+            title=titles[0], author=admin, text='text', score=5
+        )
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/?count=approximate'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['count'] == 1
+        assert not count_queries(context), (
+            'Проверьте, что число отзывов берётся из счётчика произведения.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/?count=approximate',
+        '/api/v1/users/?count=approximate',
+        '/api/v1/titles/{title}/reviews/{review}/comments/?count=approximate',
+    ))
+    def test_05_maintained_counters(self, admin_client, titles, admin, url):
+        review = Review.objects.create(
+            title=titles[0], author=admin, text='text', score=5
+        )
+        url = url.format(title=titles[0].pk, review=review.pk)
+        exact_url = url.replace('approximate', 'exact')
+        expected = admin_client.get(exact_url).json()['count']
+        assert admin_client.get(url).json()['count'] == expected
+        Title.objects.create(name='Новое', year=2000)
+        new_user = User.objects.create(username='new', email='new@yamdb.fake')
+        Comment.objects.create(review=review, author=admin, text='text')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert not count_queries(context), (
+            'Проверьте, что при `count=approximate` число объектов берётся '
+            'из счётчика.'
+        )
+        assert response.json()['count'] == expected + 1, (
+            'Проверьте, что счётчик объектов обновляется при создании.'
+        )
+        Title.objects.filter(pk=titles[1].pk).get().delete()
+        new_user.delete()
+        Comment.objects.filter(review=review).get().delete()
+        assert admin_client.get(url).json()['count'] == expected, (
+            'Проверьте, что счётчик объектов обновляется при удалении.'
+        )
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle
+
+URL = '/api/v1/titles/'
+
+
+def post_title(client, genres):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(URL, data={
+            'name': 'Произведение', 'year': 2000, 'genre': genres,
+            'category': 'films',
+        }, format='json')
+    return response, context.captured_queries
+
+
+def genre_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "reviews_genre" WHERE' in query['sql']
+    ]
+
+
+def changed_rows(queries):
+    return [
+        query['sql'].split()[0] for query in queries
+        if query['sql'].startswith(('INSERT', 'DELETE'))
+        and 'reviews_genretitle' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleGenres:
+
+    @pytest.fixture
+    def genres(self):
+        Category.objects.create(name='Фильм', slug='films')
+        return [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre{number}')
+            for number in range(6)
+        ]
+
+    def test_01_slugs_resolved_in_one_query(self, admin_client, genres):
+        response, queries = post_title(
+            admin_client, [genre.slug for genre in genres]
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['genre'] == [genre.slug for genre in genres]
+        assert len(genre_queries(queries)) == 1, (
+            'Проверьте, что все жанры произведения ищутся одним запросом.'
+        )
+        assert len(changed_rows(queries)) == 1, (
+            'Проверьте, что связи с жанрами создаются одним запросом.'
+        )
+
+    def test_02_unknown_slug(self, admin_client, genres):
+        response, _ = post_title(admin_client, ['genre0', 'unknown'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'genre': ['Объект с slug=unknown не существует.']
+        }
+        response, _ = post_title(admin_client, 'genre0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response, _ = post_title(admin_client, [['genre0']])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_patch_writes_only_changed_rows(self, admin_client, genres):
+        title_id = post_title(
+            admin_client, ['genre0', 'genre1', 'genre2']
+        )[0].json()['id']
+        url = f'{URL}{title_id}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': ['genre2', 'genre1', 'genre0']},
+                format='json',
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not changed_rows(context.captured_queries), (
+            'Проверьте, что PATCH с теми же жанрами не меняет связи.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': ['genre1', 'genre3']}, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert changed_rows(context.captured_queries) == [
+            'DELETE', 'INSERT'
+        ], (
+            'Проверьте, что PATCH удаляет и добавляет только изменившиеся '
+            'связи с жанрами.'
+        )
+        assert set(GenreTitle.objects.values_list(
+            'genre__slug', flat=True
+        )) == {'genre1', 'genre3'}
+        assert {
+            genre['slug'] for genre in admin_client.get(url).json()['genre']
+        } == {'genre1', 'genre3'}
@@ -0,0 +1,150 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import views
+from reviews.models import Category, Genre, GenreTitle, Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+def make_items(count, genres):
+    return [
+        {
+            'name': f'Произведение {number}', 'year': 2000,
+            'category': 'films', 'genre': genres,
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleBulk:
+
+    @pytest.fixture
+    def genres(self):
+        Category.objects.create(name='Фильм', slug='films')
+        Category.objects.create(name='Книга', slug='books')
+        return [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre{number}')
+            for number in range(3)
+        ]
+
+    def test_01_create_update_and_errors(self, admin_client, genres):
+        title = Title.objects.create(name='Старое', year=1990)
+        GenreTitle.objects.create(title=title, genre=genres[0])
+        response = admin_client.post(URL, data=[
+            {
+                'name': 'Новое', 'year': 2000, 'category': 'films',
+                'genre': ['genre0', 'genre1'],
+            },
+            {'id': title.pk, 'name': 'Обновлённое', 'genre': ['genre2']},
+            {'name': 'Без жанра', 'year': 3000, 'category': 'none',
+             'genre': ['unknown']},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            {'id': title.pk, 'name': 'Повтор'},
+            'не объект',
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['updated'], data['failed']) == (
+            1, 1, 4
+        ), (
+            'Проверьте, что ответ содержит число созданных, изменённых и '
+            'отклонённых произведений.'
+        )
+        results = data['results']
+        assert [result['index'] for result in results] == list(range(6))
+        assert [result['status'] for result in results] == [
+            'created', 'updated', 'failed', 'failed', 'failed', 'failed'
+        ]
+        assert set(results[2]['errors']) == {'year', 'category', 'genre'}, (
+            'Проверьте, что для каждого элемента возвращаются его ошибки.'
+        )
+        assert 'id' in results[3]['errors'] and 'id' in results[4]['errors']
+        created = Title.objects.get(pk=results[0]['id'])
+        assert created.name == 'Новое'
+        assert created.category.slug == 'films'
+        assert set(created.genre.values_list('slug', flat=True)) == {
+            'genre0', 'genre1'
+        }
+        title.refresh_from_db()
+        assert results[1]['id'] == title.pk
+        assert title.name == 'Обновлённое'
+        assert title.year == 1990
+        assert list(title.genre.values_list('slug', flat=True)) == ['genre2']
+
+    def test_02_ndjson(self, admin_client, genres):
+        response = admin_client.post(
+            URL,
+            data=(
+                '{"name": "Первое", "year": 2000, "category": "films", '
+                '"genre": ["genre0"]}\n\n'
+                '{"name": "Второе", "year": 2001, "category": "books", '
+                '"genre": []}\n'
+            ),
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['created'] == 2, (
+            'Проверьте, что эндпоинт принимает NDJSON.'
+        )
+        assert list(Title.objects.order_by('pk').values_list(
+            'name', 'category__slug'
+        )) == [('Первое', 'films'), ('Второе', 'books')]
+        response = admin_client.post(
+            URL, data='{"name": "Первое"}\n{oops}\n',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'line 2' in response.json()['detail']
+
+    def test_03_constant_queries(self, admin_client, genres):
+        slugs = [genre.slug for genre in genres]
+        counts = []
+        for count in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    URL, data=make_items(count, slugs), format='json'
+                )
+            assert response.json()['created'] == count
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от числа произведений.'
+        )
+        assert GenreTitle.objects.count() == 22 * len(genres)
+
+    def test_04_permissions_and_limits(self, client, user_client,
+                                       admin_client, genres, monkeypatch):
+        items = make_items(1, ['genre0'])
+        response = client.post(
+            URL, data=json.dumps(items), content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая запись доступна только админу.'
+        )
+        response = admin_client.post(URL, data=items[0], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        monkeypatch.setattr(views, 'TITLE_BULK_MAX_ITEMS', 1)
+        response = admin_client.post(
+            URL, data=make_items(2, ['genre0']), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Title.objects.exists()
+
+    def test_05_list_cache_invalidated(self, client, admin_client, genres):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        url = '/api/v1/titles/?count=approximate'
+        assert client.get(url).json()['count'] == 0
+        admin_client.post(URL, data=make_items(3, ['genre0']), format='json')
+        assert client.get('/api/v1/titles/').json()['count'] == 3, (
+            'Проверьте, что после массовой записи кеш списка сбрасывается.'
+        )
+        assert client.get(url).json()['count'] == 3, (
+            'Проверьте, что массовая запись обновляет счётчик произведений.'
+        )
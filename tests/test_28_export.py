@@ -0,0 +1,137 @@
+import csv
+import json
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import export
+from reviews.models import Category, Comment, Genre, Review, Title
+
+URL = '/api/v1/export/{resource}/'
+
+
+def read(response):
+    assert response.streaming, (
+        'Проверьте, что экспорт отдаётся потоковым ответом.'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in read(response).splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Export:
+
+    @pytest.fixture
+    def titles(self, admin):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre{number}')
+            for number in range(2)
+        ]
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres[:number % 3])
+            titles.append(title)
+        review = Review.objects.create(
+            title=titles[0], author=admin, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=admin, text='Коммент')
+        return titles
+
+    def test_01_titles_ndjson(self, admin_client, titles):
+        response = admin_client.get(URL.format(resource='titles'))
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = read_ndjson(response)
+        assert [row['id'] for row in rows] == [title.pk for title in titles]
+        assert rows[2] == {
+            'id': titles[2].pk, 'name': 'Произведение 2', 'year': 2000,
+            'description': None, 'rating': None, 'category': 'films',
+            'genre': ['genre0', 'genre1'],
+        }, 'Проверьте состав полей экспорта произведений.'
+        assert rows[0]['genre'] == []
+
+    def test_02_csv(self, admin_client, titles):
+        response = admin_client.get(
+            URL.format(resource='titles'), {'format': 'csv'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        assert 'titles.csv' in response['Content-Disposition']
+        rows = list(csv.DictReader(StringIO(read(response))))
+        assert len(rows) == len(titles)
+        assert rows[2]['genre'] == 'genre0,genre1'
+        assert rows[2]['category'] == 'films'
+        response = admin_client.get(
+            URL.format(resource='reviews'), HTTP_ACCEPT='text/csv'
+        )
+        review = Review.objects.get()
+        row, = csv.DictReader(StringIO(read(response)))
+        assert row['pub_date'] == review.pub_date.isoformat().replace(
+            '+00:00', 'Z'
+        )
+
+    def test_03_since(self, admin_client, titles, admin):
+        review = Review.objects.get()
+        later = Review.objects.create(
+            title=titles[1], author=admin, text='Новый', score=7
+        )
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=timezone.now() - timedelta(days=2)
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = read_ndjson(admin_client.get(
+            URL.format(resource='reviews'), {'since': since}
+        ))
+        assert [row['id'] for row in rows] == [later.pk], (
+            'Проверьте, что параметр `since` отбирает записи по `pub_date`.'
+        )
+        assert rows[0]['author'] == admin.username
+        assert len(read_ndjson(admin_client.get(
+            URL.format(resource='comments'), {'since': since}
+        ))) == 1
+        for resource, query in (
+            ('reviews', {'since': 'вчера'}),
+            ('titles', {'since': since}),
+        ):
+            response = admin_client.get(URL.format(resource=resource), query)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert 'since' in response.json()
+
+    def test_04_permissions(self, client, user_client, admin_client):
+        url = URL.format(resource='titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.get(url, {'format': 'csv'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что экспорт доступен только админу.'
+        )
+        assert 'detail' in response.json()
+        response = admin_client.get(URL.format(resource='users'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_chunked_reads(self, admin_client, titles, monkeypatch):
+        monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 2)
+        response = admin_client.get(URL.format(resource='titles'))
+        with CaptureQueriesContext(connection) as context:
+            chunks = list(response.streaming_content)
+        assert len(chunks) == 3, (
+            'Проверьте, что экспорт отдаёт данные частями.'
+        )
+        genre_queries = [
+            query for query in context.captured_queries
+            if 'reviews_genretitle' in query['sql']
+        ]
+        assert len(genre_queries) == 3, (
+            'Проверьте, что жанры читаются одним запросом на часть.'
+        )
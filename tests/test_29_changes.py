@@ -0,0 +1,190 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import changes
+from reviews.models import Category, Comment, Genre, Review, Title, Tombstone
+
+URL = '/api/v1/changes/'
+
+
+def get_changes(client, cursor=None):
+    response = client.get(URL, {'since': cursor} if cursor else {})
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+def summary(data):
+    return [
+        (entry['op'], entry['resource'], entry['id'])
+        for entry in data['results']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Changes:
+
+    @pytest.fixture(autouse=True)
+    def no_delay(self, monkeypatch):
+        monkeypatch.setattr(changes, 'CHANGES_DELAY', 0)
+
+    @pytest.fixture
+    def catalogue(self, admin):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        title.genre.set([genre])
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=8
+        )
+        comment = Comment.objects.create(
+            review=review, author=admin, text='Коммент'
+        )
+        return category, genre, title, review, comment
+
+    def test_01_full_sync(self, client, catalogue, admin):
+        category, genre, title, review, comment = catalogue
+        data = get_changes(client)
+        assert not data['more']
+        assert sorted(summary(data)) == sorted([
+            ('upsert', 'categories', category.pk),
+            ('upsert', 'genres', genre.pk),
+            ('upsert', 'titles', title.pk),
+            ('upsert', 'reviews', review.pk),
+            ('upsert', 'comments', comment.pk),
+        ]), 'Проверьте, что без `since` лента отдаёт все объекты.'
+        dates = [entry['changed_at'] for entry in data['results']]
+        assert dates == sorted(dates), (
+            'Проверьте, что изменения упорядочены по времени.'
+        )
+        entries = {entry['resource']: entry for entry in data['results']}
+        assert entries['titles']['data']['rating'] == 8
+        assert entries['titles']['data']['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        assert entries['reviews']['data']['title'] == title.pk
+        assert entries['comments']['data']['review'] == review.pk
+        assert entries['comments']['data']['title'] == title.pk
+        assert entries['comments']['data']['author'] == admin.username
+
+    def test_02_incremental_sync(self, client, admin_client, catalogue):
+        category, genre, title, review, comment = catalogue
+        cursor = get_changes(client)['cursor']
+        data = get_changes(client, cursor)
+        assert data == {'cursor': cursor, 'more': False, 'results': []}, (
+            'Проверьте, что без изменений курсор не сдвигается.'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'name': 'Новое'},
+            format='json',
+        )
+        comment_id = comment.pk
+        comment.delete()
+        data = get_changes(client, cursor)
+        assert summary(data) == [
+            ('upsert', 'titles', title.pk),
+            ('delete', 'comments', comment_id),
+        ], 'Проверьте, что лента отдаёт только изменения после курсора.'
+        assert data['results'][0]['data']['name'] == 'Новое'
+        assert 'data' not in data['results'][1]
+        assert get_changes(client, data['cursor'])['results'] == []
+
+    def test_03_indirect_title_changes(self, client, catalogue, user):
+        category, genre, title, review, comment = catalogue
+        cursor = get_changes(client)['cursor']
+        Review.objects.create(title=title, author=user, text='Ещё', score=2)
+        assert ('upsert', 'titles', title.pk) in summary(
+            get_changes(client, cursor)
+        ), 'Проверьте, что изменение рейтинга обновляет произведение.'
+        cursor = get_changes(client, cursor)['cursor']
+        genre_id, category_id = genre.pk, category.pk
+        genre.delete()
+        category.delete()
+        data = get_changes(client, cursor)
+        assert sorted(summary(data)) == sorted([
+            ('upsert', 'titles', title.pk),
+            ('delete', 'genres', genre_id),
+            ('delete', 'categories', category_id),
+        ]), (
+            'Проверьте, что удаление жанра и категории обновляет '
+            'произведение.'
+        )
+        entry, = [
+            entry for entry in data['results'] if entry['op'] == 'upsert'
+        ]
+        assert entry['data']['genre'] == []
+        assert entry['data']['category'] is None
+        cursor = data['cursor']
+        reviews = list(title.reviews.values_list('pk', flat=True))
+        title_id = title.pk
+        title.delete()
+        assert sorted(summary(get_changes(client, cursor))) == sorted([
+            ('delete', 'titles', title_id),
+            *(('delete', 'reviews', review_id) for review_id in reviews),
+            ('delete', 'comments', comment.pk),
+        ]), 'Проверьте, что каскадные удаления попадают в ленту.'
+
+    def test_04_bulk_writes_are_tracked(self, client, admin_client,
+                                        catalogue):
+        title = catalogue[2]
+        cursor = get_changes(client)['cursor']
+        admin_client.post('/api/v1/titles/bulk/', data=[
+            {'id': title.pk, 'genre': []},
+        ], format='json')
+        assert summary(get_changes(client, cursor)) == [
+            ('upsert', 'titles', title.pk)
+        ], 'Проверьте, что массовая запись обновляет дату изменения.'
+
+    def test_05_pages(self, client, monkeypatch):
+        monkeypatch.setattr(changes, 'CHANGES_PAGE_SIZE', 2)
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre{number}')
+            for number in range(5)
+        )
+        Genre.objects.filter(slug='genre4').delete()
+        seen, cursor, more = [], None, True
+        while more:
+            with CaptureQueriesContext(connection) as context:
+                data = get_changes(client, cursor)
+            assert len(context.captured_queries) <= len(changes.STREAMS) + 1
+            seen.extend(summary(data))
+            cursor, more = data['cursor'], data['more']
+        assert len(seen) == 5, (
+            'Проверьте, что страницы ленты не теряют и не повторяют записи.'
+        )
+        assert len(set(seen)) == len(seen)
+        assert seen[-1][0] == 'delete'
+
+    def test_06_delay_and_invalid_cursor(self, client, catalogue,
+                                         monkeypatch):
+        monkeypatch.setattr(changes, 'CHANGES_DELAY', 60)
+        assert get_changes(client)['results'] == [], (
+            'Проверьте, что свежие изменения придерживаются.'
+        )
+        for cursor in ('oops', 'WzEsMiwzXQ=='):
+            response = client.get(URL, {'since': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        assert Tombstone.objects.count() == 0
+
+    def test_07_related_rows_are_not_loaded_whole(self, client, catalogue):
+        with CaptureQueriesContext(connection) as context:
+            get_changes(client)
+        queries = [query['sql'] for query in context.captured_queries]
+        assert not [
+            sql for sql in queries if '"reviews_user"."email"' in sql
+        ], (
+            'Проверьте, что для авторов отзывов и комментариев читается '
+            'только `username`.'
+        )
+        assert not [
+            sql for sql in queries
+            if 'FROM "reviews_comment"' in sql
+            and '"reviews_review"."text"' in sql
+        ], (
+            'Проверьте, что для комментариев из отзыва читается только '
+            '`title_id`.'
+        )
@@ -1,5 +1,10 @@
+import os
+import subprocess
+import sys
 from http import HTTPStatus
 
+from django.core.cache.backends import locmem
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +310,27 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def run_in_process(code):
+    """Run code in a new Python process set up like another API worker."""
+    return subprocess.run(
+        [
+            sys.executable, '-c',
+            f'import django\ndjango.setup()\n{code}',
+        ],
+        cwd=os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            'api_yamdb',
+        ),
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'},
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+
+def drop_process_cache():
+    """Forget what this process keeps in memory, as a restart does."""
+    for storage in (*locmem._caches.values(), *locmem._expire_info.values()):
+        storage.clear()